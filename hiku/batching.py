@@ -0,0 +1,180 @@
+"""
+    hiku.batching
+    ~~~~~~~~~~~~~
+
+    Opt-in batching of the asynchronous data loading functions across
+    concurrently executed queries.
+
+    Calls of the same function with the same fields (or options), made during
+    configurable time window, are coalesced into one call with merged and
+    de-duplicated ids, and then results are split back between callers:
+
+    .. code-block:: python
+
+        graph = hiku.graph.apply(graph, [AsyncBatching(window=0.002)])
+
+    .. note:: Functions, which require context, are called with the context
+        of the first query in the batch, so batching should be used only when
+        context contains request-independent objects, like connection pools.
+
+    Only asynchronous functions are batched, synchronous functions are left
+    as is and called by the :py:class:`~hiku.executors.asyncio.AsyncIOExecutor`
+    using its pool.
+
+"""
+from asyncio import get_event_loop, ensure_future, CancelledError
+from collections import OrderedDict
+
+from .graph import GraphTransformer
+from .query import Field, _compute_hash
+from .engine import _do_pass_context, _copy_attrs
+from .sources.graph import CheckedExpr
+from .executors.asyncio import _is_coroutine_function
+
+
+class _Batcher:
+
+    def __init__(self, func, window):
+        self._func = func
+        self._window = window
+        self._batches = {}
+        # references to the running tasks, so they are not garbage collected
+        self._tasks = set()
+
+    async def submit(self, key, args, ids):
+        loop = get_event_loop()
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = []
+            if self._window:
+                loop.call_later(self._window, self._flush, key)
+            else:
+                loop.call_soon(self._flush, key)
+        fut = loop.create_future()
+        batch.append((args, ids, fut))
+        return await fut
+
+    def _flush(self, key):
+        task = ensure_future(self._load(self._batches.pop(key)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, batch):
+        args, first_ids, _ = batch[0]
+        if first_ids is None:
+            ids = None
+        else:
+            ids = list(OrderedDict.fromkeys(i for _, item_ids, _ in batch
+                                            for i in item_ids))
+            args = args + (ids,)
+        try:
+            result = await self._func(*args)
+            if ids is None:
+                results = [result for _ in batch]
+            else:
+                if len(result) != len(ids):
+                    raise TypeError('{!r} returned {} values for {} ids'
+                                    .format(self._func, len(result),
+                                            len(ids)))
+                mapping = dict(zip(ids, result))
+                results = [[mapping[i] for i in item_ids]
+                           for _, item_ids, _ in batch]
+        except CancelledError:
+            for _, _, fut in batch:
+                fut.cancel()
+            raise
+        except BaseException as e:
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            for (_, _, fut), value in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(value)
+
+
+def _batch_fields(func, window, root):
+    batcher = _Batcher(func, window)
+    fields_pos = 1 if _do_pass_context(func) else 0
+
+    async def wrapper(*args):
+        fields = args[fields_pos]
+        if not all(f.__class__ is Field for f in fields):
+            # complex fields are loaded without batching
+            return await func(*args)
+        key = tuple(f.index_key for f in fields)
+        if root:
+            return await batcher.submit(key, args, None)
+        else:
+            return await batcher.submit(key, args[:-1], args[-1])
+
+    return _copy_attrs(wrapper, func)
+
+
+def _batch_link(func, window, root, link):
+    ids_pos = 1 if _do_pass_context(func) else 0
+    with_ids = not root and link.requires is not None
+
+    if with_ids:
+        # batcher appends ids to the end of the arguments list
+        def load(*args):
+            return func(*args[:ids_pos], args[-1], *args[ids_pos:-1])
+        batcher = _Batcher(load, window)
+    else:
+        batcher = _Batcher(func, window)
+
+    async def wrapper(*args):
+        key = _compute_hash(args[-1]) if link.options else None
+        if with_ids:
+            other_args = args[:ids_pos] + args[ids_pos + 1:]
+            return await batcher.submit(key, other_args, args[ids_pos])
+        else:
+            return await batcher.submit(key, args, None)
+
+    return _copy_attrs(wrapper, func)
+
+
+class AsyncBatching(GraphTransformer):
+    """Graph transformer, which enables batching of the asynchronous data
+    loading functions across concurrently executed queries
+
+    :param window: time window in seconds to collect calls, by default calls
+                   are collected during one event loop iteration
+    """
+    def __init__(self, *, window=0):
+        self._window = window
+        self._node = None
+        self._wrappers = {}
+
+    def visit_node(self, obj):
+        self._node = obj
+        try:
+            return super().visit_node(obj)
+        finally:
+            self._node = None
+
+    def visit_field(self, obj):
+        obj = super().visit_field(obj)
+        if (
+            isinstance(obj.func, CheckedExpr)
+            or not _is_coroutine_function(obj.func)
+        ):
+            return obj
+        root = self._node is None
+        key = (obj.func, root)
+        wrapper = self._wrappers.get(key)
+        if wrapper is None:
+            wrapper = self._wrappers[key] = _batch_fields(obj.func,
+                                                          self._window, root)
+        obj.func = wrapper
+        return obj
+
+    def visit_link(self, obj):
+        obj = super().visit_link(obj)
+        if not _is_coroutine_function(obj.func):
+            return obj
+        obj.func = _batch_link(obj.func, self._window, self._node is None,
+                               obj)
+        return obj
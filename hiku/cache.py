@@ -0,0 +1,134 @@
+"""
+    hiku.cache
+    ~~~~~~~~~~
+
+    Opt-in caching of the data loading functions results.
+
+    Fields and links, which should be cached, are marked using ``cache``
+    argument, and engine should be configured with a cache backend:
+
+    .. code-block:: python
+
+        graph = Graph([
+            Node('User', [
+                Field('name', String, user_fields,
+                      cache=CacheSettings(ttl=60)),
+            ]),
+        ])
+
+        engine = Engine(executor, cache=InMemoryCache(maxsize=10000))
+
+    Values are cached separately for every object, so only missing values are
+    loaded using data loading functions.
+
+"""
+import json
+import time
+import hashlib
+
+from abc import ABC, abstractmethod
+from weakref import WeakKeyDictionary
+
+from .utils import LRUCache
+
+
+_namespaces = WeakKeyDictionary()
+
+
+def graph_namespace(graph):
+    """Returns namespace of the cache keys, computed from the graph types
+
+    Namespace is the same in every process, and different for graphs with
+    different types, for example for query and mutation graphs, so they don't
+    share cached values.
+    """
+    namespace = _namespaces.get(graph)
+    if namespace is None:
+        types_repr = repr(graph.__types__).encode('utf-8')
+        namespace = _namespaces[graph] = hashlib.sha1(types_repr).hexdigest()
+    return namespace
+
+
+def _options_key(options):
+    if not options:
+        return ''
+    return json.dumps(options, sort_keys=True, default=repr)
+
+
+class CacheSettings:
+    """Defines how field or link values should be cached
+
+    Example::
+
+        Field('name', String, user_fields, cache=CacheSettings(ttl=60))
+
+    Custom key function can be used to add values from the context into the
+    cache key, this function should be decorated using
+    :py:func:`~hiku.engine.pass_context` decorator in order to receive
+    context::
+
+        @pass_context
+        def locale_key(ctx, options):
+            return '{}:{}'.format(ctx['locale'], json.dumps(options))
+
+    """
+    def __init__(self, ttl, *, key=None):
+        """
+        :param ttl: time to live of the cached values in seconds
+        :param key: function to compute cache key from the field or link
+                    options, should return a string
+        """
+        self.ttl = ttl
+        self.key = key or _options_key
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.ttl)
+
+
+class CacheBackend(ABC):
+    """Interface of the cache backends
+
+    Keys are tuples of strings and objects identifiers:
+    ``(namespace, node_name, ident, field_name, options_key)``, where
+    namespace is returned by the :py:func:`graph_namespace`.
+    Backends for external storages should serialize keys and values
+    themselves.
+    """
+
+    @abstractmethod
+    def get_many(self, keys):
+        """Returns mapping of the found keys to their values
+
+        :param keys: list of keys
+        """
+
+    @abstractmethod
+    def set_many(self, items, ttl):
+        """Stores values for the specified time
+
+        :param items: mapping of keys to their values
+        :param ttl: time to live in seconds
+        """
+
+
+class InMemoryCache(CacheBackend):
+    """In-process cache backend, which discards least recently used values
+
+    :param maxsize: maximum number of the stored values
+    """
+    def __init__(self, maxsize=1000):
+        self._cache = LRUCache(maxsize)
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        result = {}
+        for key in keys:
+            item = self._cache.get(key)
+            if item is not None and item[0] > now:
+                result[key] = item[1]
+        return result
+
+    def set_many(self, items, ttl):
+        expires = time.monotonic() + ttl
+        for key, value in items.items():
+            self._cache.set(key, (expires, value))
@@ -2,6 +2,7 @@ from collections import deque
 
 from ..query import QueryVisitor, Link, Field
 from ..types import TypeRefMeta, OptionalMeta, SequenceMeta, get_type
+from ..result import CompiledProxy
 
 
 class Denormalize(QueryVisitor):
@@ -10,7 +11,8 @@ class Denormalize(QueryVisitor):
         self._types = graph.__types__
         self._result = result
         self._type = deque([self._types['__root__']])
-        self._data = deque([result])
+        self._data = deque([CompiledProxy(result.__idx__, result.__ref__,
+                                          result.__node__, graph=graph)])
         self._res = deque()
 
     def process(self, query):
@@ -4,6 +4,7 @@ from ..query import Field, Link
 from ..types import TypeRefMeta, SequenceMeta, OptionalMeta
 
 from .base import Denormalize
+from .json import DenormalizeJSON
 
 
 class DenormalizeGraphQL(Denormalize):
@@ -33,3 +34,16 @@ class DenormalizeGraphQL(Denormalize):
         self._type_name.append(type_ref.__type_name__)
         super().visit_link(obj)
         self._type_name.pop()
+
+
+class DenormalizeGraphQLJSON(DenormalizeJSON):
+
+    def __init__(self, graph, result, root_type_name, **kwargs):
+        super().__init__(graph, result, **kwargs)
+        self._root_type_name = root_type_name
+
+    def _field_value(self, obj, is_ref, field, type_name):
+        if field.name == '__typename':
+            return type_name
+        else:
+            return super()._field_value(obj, is_ref, field, type_name)
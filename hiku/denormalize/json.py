@@ -0,0 +1,111 @@
+from json import JSONEncoder
+
+from ..query import Field
+from ..types import TypeRefMeta, OptionalMeta, SequenceMeta, get_type
+from ..result import Reference
+
+
+class DenormalizeJSON:
+    """Serializes result into JSON incrementally, directly from the index
+
+    Unlike :py:class:`~hiku.denormalize.base.Denormalize`, it doesn't build
+    intermediate denormalized structure, and returns a generator of the
+    encoded chunks, suitable for streaming responses:
+
+    .. code-block:: python
+
+        chunks = DenormalizeJSON(graph, result).process(query)
+
+    :param graph: :py:class:`~hiku.graph.Graph` definition
+    :param result: result of the query
+    :param chunk_size: approximate size of the chunks in characters
+    :param encoder: :py:class:`~json.JSONEncoder` to encode field values
+    """
+    def __init__(self, graph, result, *, chunk_size=2 ** 16, encoder=None):
+        self._types = graph.__types__
+        self._index = result.__idx__
+        self._reference = result.__ref__
+        self._chunk_size = chunk_size
+        if encoder is None:
+            encoder = JSONEncoder(separators=(',', ':'))
+        self._encode = encoder.encode
+        self._root_type_name = None
+        self._keys = {}
+        self._buf = []
+        self._size = 0
+
+    def _write(self, value):
+        self._buf.append(value)
+        self._size += len(value)
+
+    def _flush(self):
+        chunk = ''.join(self._buf).encode('utf-8')
+        self._buf = []
+        self._size = 0
+        return chunk
+
+    def _node_keys(self, node):
+        try:
+            return self._keys[id(node)]
+        except KeyError:
+            keys = self._keys[id(node)] = [
+                '{}:'.format(self._encode(f.result_key)) for f in node.fields
+            ]
+            return keys
+
+    def _field_value(self, obj, is_ref, field, type_name):
+        return obj[field.index_key if is_ref else field.result_key]
+
+    def _object(self, type_, type_name, obj, is_ref, node):
+        write = self._write
+        write('{')
+        for i, (field, key) in enumerate(zip(node.fields,
+                                             self._node_keys(node))):
+            if i:
+                write(',')
+            write(key)
+            if field.__class__ is Field:
+                value = self._field_value(obj, is_ref, field, type_name)
+                write(self._encode(value))
+            else:
+                value = obj[field.index_key if is_ref else field.result_key]
+                field_type = type_.__field_types__[field.name]
+                yield from self._link(field_type, value, field.node)
+        write('}')
+
+    def _ref(self, type_ref, value, node):
+        type_ = get_type(self._types, type_ref)
+        if isinstance(value, Reference):
+            obj = self._index[value.node][value.ident]
+            yield from self._object(type_, type_ref.__type_name__, obj, True,
+                                    node)
+        else:
+            yield from self._object(type_, type_ref.__type_name__, value,
+                                    False, node)
+
+    def _link(self, type_, value, node):
+        if isinstance(type_, TypeRefMeta):
+            yield from self._ref(type_, value, node)
+        elif isinstance(type_, SequenceMeta):
+            self._write('[')
+            for i, item in enumerate(value):
+                if i:
+                    self._write(',')
+                yield from self._ref(type_.__item_type__, item, node)
+                if self._size >= self._chunk_size:
+                    yield self._flush()
+            self._write(']')
+        elif isinstance(type_, OptionalMeta):
+            if value is None:
+                self._write('null')
+            else:
+                yield from self._ref(type_.__type__, value, node)
+        else:
+            raise AssertionError(repr(type_))
+
+    def process(self, query):
+        assert not self._buf, self._buf
+        root = self._index[self._reference.node][self._reference.ident]
+        yield from self._object(self._types['__root__'],
+                                self._root_type_name, root, True, query)
+        yield self._flush()
@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
 from asyncio import gather
+from hashlib import sha256
+from weakref import WeakKeyDictionary
+
+from graphql.language.parser import parse
 
 from ..graph import apply
 from ..query import QueryTransformer
+from ..utils import LRUCache
 from ..validate.query import validate
-from ..readers.graphql import read_operation, OperationType
+from ..readers.graphql import read_operation, OperationType, OperationGetter
+from ..readers.graphql import Operation, _read_operation
 from ..denormalize.graphql import DenormalizeGraphQL
 from ..introspection.graphql import AsyncGraphQLIntrospection, QUERY_ROOT_NAME
 from ..introspection.graphql import GraphQLIntrospection, MUTATION_ROOT_NAME
@@ -30,26 +36,6 @@ class _StripQuery(QueryTransformer):
                                 if f.name != '__typename'])
 
 
-def _switch_graph(data, query_graph, mutation_graph=None):
-    try:
-        op = read_operation(data['query'],
-                            variables=data.get('variables'),
-                            operation_name=data.get('operationName'))
-    except TypeError as e:
-        raise GraphQLError(errors=[
-            'Failed to read query: {}'.format(e),
-        ])
-    if op.type is OperationType.QUERY:
-        graph = query_graph
-    elif op.type is OperationType.MUTATION and mutation_graph is not None:
-        graph = mutation_graph
-    else:
-        raise GraphQLError(errors=[
-            'Unsupported operation type: {!r}'.format(op.type),
-        ])
-    return graph, op
-
-
 def _process_query(graph, query):
     stripped_query = _StripQuery().visit(query)
     errors = validate(graph, stripped_query)
@@ -59,6 +45,31 @@ def _process_query(graph, query):
         return stripped_query
 
 
+class PersistedQueriesStore(ABC):
+    """Storage of the persisted queries, identified by their SHA-256 hash"""
+
+    @abstractmethod
+    def get(self, query_hash):
+        """Returns query text or ``None`` if query wasn't registered"""
+
+    @abstractmethod
+    def set(self, query_hash, query):
+        """Registers query text"""
+
+
+class InMemoryPersistedQueries(PersistedQueriesStore):
+    """Stores persisted queries in memory, in a bounded LRU cache"""
+
+    def __init__(self, maxsize=1000):
+        self._queries = LRUCache(maxsize)
+
+    def get(self, query_hash):
+        return self._queries.get(query_hash)
+
+    def set(self, query_hash, query):
+        self._queries.set(query_hash, query)
+
+
 class BaseGraphQLEndpoint(ABC):
 
     @property
@@ -66,8 +77,21 @@ class BaseGraphQLEndpoint(ABC):
     def introspection_cls(self):
         pass
 
-    def __init__(self, engine, query_graph, mutation_graph=None):
+    def __init__(
+        self, engine, query_graph, mutation_graph=None, *, cache_size=None,
+        persisted_queries=None
+    ):
+        """
+        :param engine: :py:class:`hiku.engine.Engine`
+        :param query_graph: graph to execute queries
+        :param mutation_graph: optional graph to execute mutations
+        :param cache_size: enables cache of the parsed and validated
+                           documents for the specified number of documents
+        :param persisted_queries: :py:class:`PersistedQueriesStore` to enable
+                                  automatic persisted queries support
+        """
         self.engine = engine
+        self.persisted_queries = persisted_queries
 
         introspection = self.introspection_cls(query_graph, mutation_graph)
         self.query_graph = apply(query_graph, [introspection])
@@ -76,6 +100,109 @@ class BaseGraphQLEndpoint(ABC):
         else:
             self.mutation_graph = None
 
+        if cache_size:
+            self._documents = LRUCache(cache_size)
+            # cached operations -> validation results
+            self._validated = WeakKeyDictionary()
+        else:
+            self._documents = None
+            self._validated = None
+
+    def _get_query(self, data):
+        extensions = data.get('extensions') or {}
+        persisted_query = extensions.get('persistedQuery')
+        if persisted_query is None:
+            return data['query']
+        if self.persisted_queries is None:
+            if data.get('query') is None:
+                # hash-only request, client should send the full query
+                raise GraphQLError(errors=['PersistedQueryNotSupported'])
+            return data['query']
+
+        if persisted_query.get('version') != 1:
+            raise GraphQLError(errors=[
+                'Unsupported persisted query version: {!r}'
+                .format(persisted_query.get('version')),
+            ])
+        query_hash = persisted_query.get('sha256Hash')
+        query = data.get('query')
+        if query is None:
+            query = self.persisted_queries.get(query_hash)
+            if query is None:
+                raise GraphQLError(errors=['PersistedQueryNotFound'])
+        else:
+            if sha256(query.encode('utf-8')).hexdigest() != query_hash:
+                raise GraphQLError(errors=['Provided sha256Hash does not '
+                                           'match query'])
+            self.persisted_queries.set(query_hash, query)
+        return query
+
+    def _read_operation(self, data):
+        src = self._get_query(data)
+        variables = data.get('variables')
+        operation_name = data.get('operationName')
+        if self._documents is None:
+            return read_operation(src, variables=variables,
+                                  operation_name=operation_name)
+
+        key = (src, operation_name)
+        cached = self._documents.get(key)
+        if cached is None:
+            doc = parse(src)
+            op = OperationGetter.get(doc, operation_name=operation_name)
+            if op.variable_definitions:
+                # variables are applied after cached parse step
+                cached = (doc, op)
+            else:
+                # operations without variables are cached entirely
+                cached = _read_operation(doc, op, None)
+                self._validated[cached] = None
+            self._documents.set(key, cached)
+
+        if isinstance(cached, Operation):
+            return cached
+        else:
+            doc, op = cached
+            return _read_operation(doc, op, variables)
+
+    def _switch_graph(self, data):
+        try:
+            op = self._read_operation(data)
+        except TypeError as e:
+            raise GraphQLError(errors=[
+                'Failed to read query: {}'.format(e),
+            ])
+        if op.type is OperationType.QUERY:
+            graph = self.query_graph
+        elif (
+            op.type is OperationType.MUTATION
+            and self.mutation_graph is not None
+        ):
+            graph = self.mutation_graph
+        else:
+            raise GraphQLError(errors=[
+                'Unsupported operation type: {!r}'.format(op.type),
+            ])
+        return graph, op
+
+    def _process_query(self, graph, op):
+        if self._validated is None or op not in self._validated:
+            return _process_query(graph, op.query)
+
+        validated = self._validated[op]
+        if validated is None:
+            try:
+                validated = (_process_query(graph, op.query), None)
+            except GraphQLError as e:
+                validated = (None, e.errors)
+            self._validated[op] = validated
+
+        stripped_query, errors = validated
+        if errors:
+            raise GraphQLError(errors=errors)
+        else:
+            return stripped_query
+
     @abstractmethod
     def execute(self, graph, op, ctx):
         pass
@@ -89,16 +216,14 @@ class GraphQLEndpoint(BaseGraphQLEndpoint):
     introspection_cls = GraphQLIntrospection
 
     def execute(self, graph, op, ctx):
-        stripped_query = _process_query(graph, op.query)
+        stripped_query = self._process_query(graph, op)
         result = self.engine.execute(graph, stripped_query, ctx)
         type_name = _type_names[op.type]
         return DenormalizeGraphQL(graph, result, type_name).process(op.query)
 
     def dispatch(self, data):
         try:
-            graph, op = _switch_graph(
-                data, self.query_graph, self.mutation_graph,
-            )
+            graph, op = self._switch_graph(data)
             result = self.execute(graph, op, {})
             return {'data': result}
         except GraphQLError as e:
@@ -121,16 +246,14 @@ class AsyncGraphQLEndpoint(BaseGraphQLEndpoint):
     introspection_cls = AsyncGraphQLIntrospection
 
     async def execute(self, graph, op, ctx):
-        stripped_query = _process_query(graph, op.query)
+        stripped_query = self._process_query(graph, op)
         result = await self.engine.execute(graph, stripped_query, ctx)
         type_name = _type_names[op.type]
         return DenormalizeGraphQL(graph, result, type_name).process(op.query)
 
     async def dispatch(self, data):
         try:
-            graph, op = _switch_graph(
-                data, self.query_graph, self.mutation_graph,
-            )
+            graph, op = self._switch_graph(data)
             result = await self.execute(graph, op, {})
             return {'data': result}
         except GraphQLError as e:
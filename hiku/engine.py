@@ -3,13 +3,16 @@ import warnings
 
 from functools import partial
 from itertools import chain, repeat
-from collections import defaultdict
+from weakref import WeakKeyDictionary
+from collections import OrderedDict, defaultdict
 from collections.abc import Sequence, Mapping
 
 from . import query as hiku_query
 from .graph import Link, Maybe, One, Many, Nothing, Field
 from .result import Proxy, Index, ROOT, Reference
-from .executors.queue import Workflow, Queue
+from .utils import LRUCache
+from .cache import graph_namespace
+from .executors.queue import Workflow, Queue, ConcurrencyLimits
 
 
 def _yield_options(graph_obj, query_obj):
@@ -54,6 +57,8 @@ class InitOptions(hiku_query.QueryTransformer):
             node = obj.node
 
         options = _get_options(graph_obj, obj) if graph_obj.options else None
+        if isinstance(graph_obj, Link) and graph_obj.pagination is not None:
+            options = graph_obj.pagination.init_options(options)
         return obj.copy(node=node, options=options)
 
 
@@ -125,14 +130,25 @@ class GroupQuery(hiku_query.QueryVisitor):
         self._current_func = None
 
 
-def _check_store_fields(node, fields, ids, result):
+def _all_sequences(items):
+    # checks only distinct types, which is much faster than isinstance()
+    # check of every item
+    return all(issubclass(t, Sequence) for t in set(map(type, items)))
+
+
+def _is_rows(result, size, deep_check):
+    if not deep_check:
+        return True
+    return _all_sequences(result) and set(map(len, result)) <= {size}
+
+
+def _check_store_fields(node, fields, ids, result, deep_check=True):
     if node.name is not None:
         assert ids is not None
         if (
             isinstance(result, Sequence)
             and len(result) == len(ids)
-            and all(isinstance(r, Sequence) and len(r) == len(fields)
-                    for r in result)
+            and _is_rows(result, len(fields), deep_check)
         ):
             return
         else:
@@ -149,25 +165,61 @@ def _check_store_fields(node, fields, ids, result):
                             expected, result))
 
 
-def store_fields(index, node, query_fields, ids, query_result):
+def store_fields(index, node, query_fields, ids, query_result,
+                 deep_check=True):
     if inspect.isgenerator(query_result):
         warnings.warn('Data loading functions should not return generators',
                       DeprecationWarning)
         query_result = list(query_result)
 
-    _check_store_fields(node, query_fields, ids, query_result)
+    _check_store_fields(node, query_fields, ids, query_result, deep_check)
 
     names = [f.index_key for f in query_fields]
     if node.name is not None:
         assert ids is not None
-        node_idx = index[node.name]
-        for i, row in zip(ids, query_result):
-            node_idx[i].update(zip(names, row))
+        index[node.name].store(ids, names, query_result)
     else:
         assert ids is None
         index.root.update(zip(names, query_result))
 
 
+def _unique(ids):
+    return list(OrderedDict.fromkeys(ids))
+
+
+def _not_loaded(index, node, query_fields, ids):
+    # complex fields are always loaded, because they can be requested with
+    # different sub-queries
+    if node.name not in index or not all(f.__class__ is hiku_query.Field
+                                         for f in query_fields):
+        return ids
+    node_idx = index[node.name]
+    keys = [f.index_key for f in query_fields]
+    return [i for i in ids
+            if i not in node_idx or not all(k in node_idx[i] for k in keys)]
+
+
+class _Memo:
+    # values of the fields and futures of the pending data loading functions
+    # calls, keyed by (func, index_key, ident)
+
+    def __init__(self):
+        self.values = {}
+        self.pending = {}
+
+
+# memo is bound to the queue, which is created for every query execution, so
+# it is shared between the main query and all nested subgraph queries
+_memos = WeakKeyDictionary()
+
+
+def _get_memo(queue):
+    memo = _memos.get(queue)
+    if memo is None:
+        memo = _memos[queue] = _Memo()
+    return memo
+
+
 def link_reqs(index, node, link, ids):
     if node.name is not None:
         assert ids is not None
@@ -200,7 +252,22 @@ _LINK_REF_MAKER = {
 }
 
 
-def _check_store_links(node, link, ids, result):
+def link_refs(graph_link, idents):
+    # same as _LINK_REF_MAKER functions, but for a list of values
+    node = graph_link.node
+    if graph_link.type_enum is Maybe:
+        return [None if i is Nothing else Reference(node, i) for i in idents]
+    elif graph_link.type_enum is One:
+        refs = list(map(Reference, repeat(node), idents))
+        assert all(r.ident is not Nothing for r in refs)
+        return refs
+    elif graph_link.type_enum is Many:
+        return [list(map(Reference, repeat(node), i)) for i in idents]
+    else:
+        raise TypeError(graph_link.type_enum)
+
+
+def _check_store_links(node, link, ids, result, deep_check=True):
     if node.name is not None and link.requires is not None:
         assert ids is not None
         if link.type_enum is Maybe or link.type_enum is One:
@@ -212,7 +279,7 @@ def _check_store_links(node, link, ids, result):
             if (
                 isinstance(result, Sequence)
                 and len(result) == len(ids)
-                and all(isinstance(r, Sequence) for r in result)
+                and (not deep_check or _all_sequences(result))
             ):
                 return
             else:
@@ -235,20 +302,34 @@ def _check_store_links(node, link, ids, result):
                             expected, result))
 
 
-def store_links(index, node, graph_link, query_link, ids, query_result):
-    _check_store_links(node, graph_link, ids, query_result)
+def store_links(index, node, graph_link, query_link, ids, query_result,
+                deep_check=True):
+    _check_store_links(node, graph_link, ids, query_result, deep_check)
 
-    field_val = partial(_LINK_REF_MAKER[graph_link.type_enum], graph_link)
     if node.name is not None:
         assert ids is not None
         if graph_link.requires is None:
             query_result = repeat(query_result, len(ids))
 
-        node_idx = index[node.name]
-        for i, res in zip(ids, query_result):
-            node_idx[i][query_link.index_key] = field_val(res)
+        index[node.name].store_column(ids, query_link.index_key,
+                                      link_refs(graph_link, query_result))
     else:
-        index.root[query_link.index_key] = field_val(query_result)
+        field_val = _LINK_REF_MAKER[graph_link.type_enum]
+        index.root[query_link.index_key] = field_val(graph_link, query_result)
+
+
+def _link_page(graph_link, query_link, from_list, result):
+    # selects requested page, if link function returned more identifiers,
+    # invalid results are left as is to be reported by store_links
+    page = graph_link.pagination.page
+    options = query_link.options
+    if not isinstance(result, Sequence):
+        return result
+    if from_list:
+        return [page(ids, options) if isinstance(ids, Sequence) else ids
+                for ids in result]
+    else:
+        return page(result, options)
 
 
 def link_result_to_ids(from_list, link_type, result):
@@ -274,106 +355,435 @@ def link_result_to_ids(from_list, link_type, result):
     raise TypeError(repr([from_list, link_type]))
 
 
+def _bind(query_node, pos):
+    # position of the field in the query node or a field, which is required
+    # by link and wasn't requested in the query
+    if pos.__class__ is int:
+        return query_node.fields[pos]
+    else:
+        return pos
+
+
+def _positions(query_node, items):
+    positions = {id(f): i for i, f in enumerate(query_node.fields)}
+    return [(graph_obj, positions.get(id(query_obj), query_obj))
+            for graph_obj, query_obj in items]
+
+
+class NodePlan:
+    """Pre-computed execution plan of the query node
+
+    Plan depends only on the query structure, so it can be reused for
+    queries with the same structure, see :py:func:`query_shape`.
+    """
+    __slots__ = ('steps', 'fields', 'links')
+
+    def __init__(self, *, steps=None, fields=None, links=None):
+        self.steps = steps
+        self.fields = fields
+        self.links = links
+
+    @classmethod
+    def _link_plan(cls, graph, graph_obj, query_obj):
+        if isinstance(graph_obj, Link):
+            return cls.compile(graph, graph.nodes_map[graph_obj.node],
+                               query_obj.node)
+        else:
+            return None
+
+    @classmethod
+    def compile(cls, graph, graph_node, query_node):
+        if query_node.ordered:
+            steps = []
+            for func, item in GroupQuery(graph_node).group(query_node):
+                if isinstance(item, list):
+                    steps.append((func, _positions(query_node, item)))
+                else:
+                    [(graph_link, pos)] = _positions(query_node, [item])
+                    link_plan = cls._link_plan(graph, graph_link, item[1])
+                    steps.append((func, (graph_link, pos, link_plan)))
+            return cls(steps=steps)
+
+        fields, links = SplitQuery(graph_node).split(query_node)
+
+        to_func = {}
+        from_func = OrderedDict()
+        for func, graph_field, query_field in fields:
+            to_func[graph_field.name] = func
+            from_func.setdefault(func, []).append((graph_field, query_field))
+
+        link_items = []
+        for graph_link, query_link in links:
+            [(_, pos)] = _positions(query_node, [(graph_link, query_link)])
+            if graph_link.requires:
+                requires_func = to_func[graph_link.requires]
+            else:
+                requires_func = None
+            link_items.append((graph_link, pos, requires_func,
+                               cls._link_plan(graph, graph_link, query_link)))
+
+        return cls(
+            fields=[(func, _positions(query_node, func_fields))
+                    for func, func_fields in from_func.items()],
+            links=link_items,
+        )
+
+
+def query_shape(query_node):
+    """Returns hashable representation of the query structure, including
+    fields options and aliases
+    """
+    return (query_node.ordered, tuple(
+        (f.index_key, f.result_key, query_shape(f.node))
+        if isinstance(f, hiku_query.Link)
+        else (f.index_key, f.result_key)
+        for f in query_node.fields
+    ))
+
+
 class Query(Workflow):
 
-    def __init__(self, queue, task_set, graph, query, ctx):
+    def __init__(self, queue, task_set, graph, query, ctx, plan=None,
+                 index_class=Index, deep_check=True, cache=None,
+                 memoize=False):
         self._queue = queue
         self._task_set = task_set
         self._graph = graph
         self._query = query
         self._ctx = ctx
-        self._index = Index()
+        self._plan = plan
+        self._index = index_class()
+        self._deep_check = deep_check
+        self._cache = cache
+        self._memo = _get_memo(queue) if memoize else None
 
-    def _submit(self, func, *args, **kwargs):
+    def _submit_to(self, task_set, func, *args, **kwargs):
         if _do_pass_context(func):
-            return self._task_set.submit(func, self._ctx, *args, **kwargs)
+            return task_set.submit(func, self._ctx, *args, **kwargs)
         else:
-            return self._task_set.submit(func, *args, **kwargs)
+            return task_set.submit(func, *args, **kwargs)
+
+    def _submit(self, func, *args, **kwargs):
+        return self._submit_to(self._task_set, func, *args, **kwargs)
 
     def start(self):
-        self.process_node(self._graph.root, self._query, None)
+        self.process_node(self._graph.root, self._query, None, self._plan)
 
     def result(self):
         self._index.finish()
         return Proxy(self._index, ROOT, self._query)
 
-    def _process_node_ordered(self, node, query, ids):
-        proc_steps = GroupQuery(node).group(query)
-
+    def _process_node_ordered(self, node, query, ids, plan):
         # recursively and sequentially schedule fields and links
         def proc(steps):
-            step_func, step_item = steps.pop(0)
+            (step_func, step_item), steps = steps[0], steps[1:]
             if isinstance(step_item, list):
-                dep = self._schedule_fields(node, step_func, step_item, ids)
+                fields = [(gf, _bind(query, pos)) for gf, pos in step_item]
+                dep = self._schedule_fields(node, step_func, fields, ids)
             else:
-                graph_link, query_link = step_item
-                dep = self._schedule_link(node, graph_link, query_link, ids)
+                graph_link, pos, link_plan = step_item
+                dep = self._schedule_link(node, graph_link, _bind(query, pos),
+                                          ids, link_plan)
 
             if steps:
-                self._queue.add_callback(dep, lambda: proc(steps))
-
-        if proc_steps:
-            proc(proc_steps)
+                if dep is None:
+                    proc(steps)
+                else:
+                    self._queue.add_callback(dep, lambda: proc(steps))
+
+        if plan.steps:
+            proc(plan.steps)
+
+    def process_node(self, node, query, ids, plan=None):
+        if plan is None:
+            plan = NodePlan.compile(self._graph, node, query)
+
+        if plan.steps is not None:
+            self._ctx.requested_links.update(
+                item[0].name for _, item in plan.steps
+                if not isinstance(item, list)
+            )
+        else:
+            self._ctx.requested_links.update(
+                graph_link.name for graph_link, _, _, _ in plan.links
+            )
 
-    def process_node(self, node, query, ids):
         if query.ordered:
-            self._process_node_ordered(node, query, ids)
+            self._process_node_ordered(node, query, ids, plan)
             return
 
-        fields, links = SplitQuery(node).split(query)
-
-        to_func = {}
-        from_func = defaultdict(list)
-        for func, graph_field, query_field in fields:
-            to_func[graph_field.name] = func
-            from_func[func].append((graph_field, query_field))
-
         # schedule fields resolve
         to_dep = {}
-        for func, func_fields in from_func.items():
-            to_dep[func] = self._schedule_fields(node, func, func_fields, ids)
+        for func, func_fields in plan.fields:
+            fields = [(gf, _bind(query, pos)) for gf, pos in func_fields]
+            to_dep[func] = self._schedule_fields(node, func, fields, ids)
 
         # schedule link resolve
-        for graph_link, query_link in links:
-            schedule = partial(self._schedule_link, node,
-                               graph_link, query_link, ids)
-            if graph_link.requires:
-                dep = to_dep[to_func[graph_link.requires]]
-                self._queue.add_callback(dep, schedule)
-            else:
+        for graph_link, pos, requires_func, link_plan in plan.links:
+            schedule = partial(self._schedule_link, node, graph_link,
+                               _bind(query, pos), ids, link_plan)
+            dep = None
+            if requires_func is not None:
+                dep = to_dep[requires_func]
+            if dep is None:
                 schedule()
+            else:
+                self._queue.add_callback(dep, schedule)
 
-    def process_link(self, node, graph_link, query_link, ids, result):
+    def process_link(self, node, graph_link, query_link, ids, result,
+                     plan=None):
         if inspect.isgenerator(result):
             warnings.warn('Data loading functions should not return generators',
                           DeprecationWarning)
             result = list(result)
-        store_links(self._index, node, graph_link, query_link, ids, result)
         from_list = ids is not None and graph_link.requires is not None
+        if graph_link.pagination is not None:
+            result = _link_page(graph_link, query_link, from_list, result)
+        store_links(self._index, node, graph_link, query_link, ids, result,
+                    self._deep_check)
         to_ids = link_result_to_ids(from_list, graph_link.type_enum, result)
         if to_ids:
             self.process_node(self._graph.nodes_map[graph_link.node],
-                              query_link.node, to_ids)
+                              query_link.node, _unique(to_ids), plan)
+
+    def _cache_key(self, node, graph_obj, query_obj):
+        # returns function to make cache keys for the objects idents
+        key_func = graph_obj.cache.key
+        if _do_pass_context(key_func):
+            options_key = key_func(self._ctx, query_obj.options)
+        else:
+            options_key = key_func(query_obj.options)
+        namespace = graph_namespace(self._graph)
+        node_name = node.name or ROOT.node
+        return lambda ident: (namespace, node_name, ident, graph_obj.name,
+                              options_key)
+
+    def _is_cached(self, graph_field, query_field):
+        # complex fields are not cached, because their values depend on
+        # sub-queries
+        return (graph_field.cache is not None
+                and query_field.__class__ is hiku_query.Field)
+
+    def _cache_fields(self, node, fields, ids):
+        node_idx = self._index[node.name or ROOT.node]
+        idents = [ROOT.ident] if ids is None else ids
+        by_ttl = defaultdict(dict)
+        for gf, qf in fields:
+            if self._is_cached(gf, qf):
+                key = self._cache_key(node, gf, qf)
+                items = by_ttl[gf.cache.ttl]
+                for i in idents:
+                    items[key(i)] = node_idx[i][qf.index_key]
+        for ttl, items in by_ttl.items():
+            self._cache.set_many(items, ttl)
+
+    def _load_memo_fields(self, task_set, node, func, fields, ids):
+        query_fields = [qf for _, qf in fields]
+        keys = [qf.index_key for qf in query_fields]
+        values, pending = self._memo.values, self._memo.pending
+
+        # ids are grouped by missing fields, to load every value only once
+        groups = OrderedDict()
+        waits = set()
+        for i in ids:
+            missing = []
+            for pos, k in enumerate(keys):
+                if (func, k, i) in values:
+                    continue
+                dep = pending.get((func, k, i))
+                if dep is None:
+                    missing.append(pos)
+                else:
+                    waits.add(dep)
+            if missing:
+                groups.setdefault(tuple(missing), []).append(i)
+
+        def store_memo():
+            store_fields(self._index, node, query_fields, ids,
+                         [[values[(func, k, i)] for k in keys] for i in ids],
+                         self._deep_check)
+            if self._cache is not None:
+                self._cache_fields(node, fields, ids)
+
+        if not groups and not waits:
+            store_memo()
+            return None
+
+        if len(groups) == 1 and not waits:
+            dep = None
+        else:
+            dep = self._queue.fork(task_set)
+            for wait_dep in waits:
+                self._queue.wait(dep, wait_dep)
+
+        for positions, group_ids in groups.items():
+            group_fields = [query_fields[pos] for pos in positions]
+            loaded = self._submit_to(dep or task_set, func, group_fields,
+                                     group_ids)
+            for i in group_ids:
+                for f in group_fields:
+                    pending[(func, f.index_key, i)] = loaded
+            self._queue.add_callback(loaded, partial(
+                self._store_memo_group, node, func, group_fields, group_ids,
+                loaded,
+            ))
+            if dep is None:
+                dep = loaded
+
+        self._queue.add_callback(dep, store_memo)
+        return dep
+
+    def _store_memo_group(self, node, func, query_fields, ids, loaded):
+        store_fields(self._index, node, query_fields, ids, loaded.result(),
+                     self._deep_check)
+        node_idx = self._index[node.name]
+        values, pending = self._memo.values, self._memo.pending
+        for i in ids:
+            for f in query_fields:
+                values[(func, f.index_key, i)] = node_idx[i][f.index_key]
+                pending.pop((func, f.index_key, i), None)
+
+    def _load_fields(self, task_set, node, func, fields, ids):
+        if (
+            self._memo is not None
+            and ids is not None
+            and not hasattr(func, '__subquery__')
+            and all(qf.__class__ is hiku_query.Field for _, qf in fields)
+        ):
+            return self._load_memo_fields(task_set, node, func, fields, ids)
 
-    def _schedule_fields(self, node, func, fields, ids):
         query_fields = [qf for _, qf in fields]
         if hasattr(func, '__subquery__'):
             assert ids is not None
-            dep = self._queue.fork(self._task_set)
+            dep = self._queue.fork(task_set)
             proc = func(fields, ids, self._queue, self._ctx, dep)
         else:
             if ids is None:
-                dep = self._submit(func, query_fields)
+                dep = self._submit_to(task_set, func, query_fields)
             else:
-                dep = self._submit(func, query_fields, ids)
+                dep = self._submit_to(task_set, func, query_fields, ids)
             proc = dep.result
-        self._queue.add_callback(
-            dep,
-            lambda: store_fields(self._index, node, query_fields, ids, proc())
-        )
+
+        def store():
+            store_fields(self._index, node, query_fields, ids, proc(),
+                         self._deep_check)
+            if self._cache is not None:
+                self._cache_fields(node, fields, ids)
+
+        self._queue.add_callback(dep, store)
         return dep
 
-    def _schedule_link(self, node, graph_link, query_link, ids):
+    def _schedule_cached_fields(self, node, func, fields, ids):
+        cached = [(gf, qf) for gf, qf in fields if self._is_cached(gf, qf)]
+        other = [(gf, qf) for gf, qf in fields if not self._is_cached(gf, qf)]
+        idents = [ROOT.ident] if ids is None else ids
+        keys = [[key(i) for i in idents]
+                for key in (self._cache_key(node, gf, qf) for gf, qf in cached)]
+        hits = self._cache.get_many([k for field_keys in keys
+                                     for k in field_keys])
+
+        found, missing = [], []
+        for pos, ident in enumerate(idents):
+            if all(field_keys[pos] in hits for field_keys in keys):
+                found.append((ident, [hits[field_keys[pos]]
+                                      for field_keys in keys]))
+            else:
+                missing.append(ident)
+        if found:
+            found_ids, rows = zip(*found)
+            store_fields(self._index, node, [qf for _, qf in cached],
+                         None if ids is None else list(found_ids),
+                         rows[0] if ids is None else list(rows))
+
+        if not missing:
+            loads = [(other, ids)] if other else []
+        elif len(missing) == len(idents):
+            loads = [(fields, ids)]
+        else:
+            loads = [(cached, missing)]
+            if other:
+                loads.append((other, ids))
+        if not loads:
+            # all fields are found in cache
+            return None
+        elif len(loads) == 1:
+            (load_fields, load_ids), = loads
+            return self._load_fields(self._task_set, node, func, load_fields,
+                                     load_ids)
+        else:
+            dep = self._queue.fork(self._task_set)
+            for load_fields, load_ids in loads:
+                self._load_fields(dep, node, func, load_fields, load_ids)
+            return dep
+
+    def _schedule_fields(self, node, func, fields, ids):
+        if ids is not None:
+            ids = _not_loaded(self._index, node, [qf for _, qf in fields], ids)
+            if not ids:
+                # all fields are already loaded
+                return None
+
+        if (
+            self._cache is not None
+            and any(self._is_cached(gf, qf) for gf, qf in fields)
+        ):
+            return self._schedule_cached_fields(node, func, fields, ids)
+        else:
+            return self._load_fields(self._task_set, node, func, fields, ids)
+
+    def _schedule_cached_link(self, node, graph_link, query_link, ids, plan):
+        from_list = ids is not None and graph_link.requires is not None
+        if from_list:
+            idents = ids
+        else:
+            idents = [ROOT.ident if ids is None else None]
+        key = self._cache_key(node, graph_link, query_link)
+        keys = [key(i) for i in idents]
+        hits = self._cache.get_many(keys)
+
+        if len(hits) == len(keys):
+            result = [hits[k] for k in keys]
+            self.process_link(node, graph_link, query_link, ids,
+                              result if from_list else result[0], plan)
+            return None
+
+        missing = [i for i, k in zip(idents, keys) if k not in hits]
+        args = []
+        if graph_link.requires:
+            args.append(link_reqs(self._index, node, graph_link,
+                                  missing if from_list else ids))
+        if graph_link.options:
+            args.append(query_link.options)
+        dep = self._submit(graph_link.func, *args)
+
+        def callback():
+            result = dep.result()
+            if not from_list:
+                self._cache.set_many({keys[0]: result}, graph_link.cache.ttl)
+                self.process_link(node, graph_link, query_link, ids, result,
+                                  plan)
+                return
+            if inspect.isgenerator(result):
+                result = list(result)
+            if not isinstance(result, Sequence) or len(result) != len(missing):
+                # reports invalid result
+                self.process_link(node, graph_link, query_link, missing,
+                                  result, plan)
+                return
+            loaded = dict(zip(missing, result))
+            self._cache.set_many({key(i): loaded[i] for i in missing},
+                                 graph_link.cache.ttl)
+            self.process_link(node, graph_link, query_link, ids,
+                              [hits[k] if k in hits else loaded[i]
+                               for i, k in zip(ids, keys)], plan)
+
+        self._queue.add_callback(dep, callback)
+        return dep
+
+    def _schedule_link(self, node, graph_link, query_link, ids, plan=None):
+        if self._cache is not None and graph_link.cache is not None:
+            return self._schedule_cached_link(node, graph_link, query_link,
+                                              ids, plan)
         args = []
         if graph_link.requires:
             args.append(link_reqs(self._index, node, graph_link, ids))
@@ -382,7 +792,8 @@ class Query(Workflow):
         dep = self._submit(graph_link.func, *args)
         self._queue.add_callback(dep, (
             lambda:
-            self.process_link(node, graph_link, query_link, ids, dep.result())
+            self.process_link(node, graph_link, query_link, ids, dep.result(),
+                              plan)
         ))
         return dep
 
@@ -396,10 +807,45 @@ def _do_pass_context(func):
     return getattr(func, '__pass_context__', False)
 
 
+def _copy_attrs(wrapper, func):
+    """Copies attributes, set by decorators, from the data loading function
+    to its wrapper
+    """
+    if _do_pass_context(func):
+        wrapper = pass_context(wrapper)
+    for attr in ('__concurrency_limit__', '__concurrency_key__',
+                 '__run_in_process__'):
+        if hasattr(func, attr):
+            setattr(wrapper, attr, getattr(func, attr))
+    return wrapper
+
+
+def limit_concurrency(limit, *, key=None):
+    """Limits number of concurrently running calls of the data loading
+    function, excess calls are queued
+
+    Limit is shared by all queries, concurrently executed by the same
+    :py:class:`Engine`, and functions with the same ``key`` share the same
+    limit, this is useful to limit number of concurrently used connections
+    to the database.
+    """
+    def decorator(func):
+        func.__concurrency_limit__ = limit
+        if key is not None:
+            func.__concurrency_key__ = key
+        return func
+    return decorator
+
+
 class Context(Mapping):
 
     def __init__(self, mapping):
         self.__mapping = mapping
+        #: names of the links, requested in the query, data sources can use
+        #: them to fetch identifiers of the links in advance
+        self.requested_links = set()
+        #: request-scoped state of the data sources
+        self.state = {}
 
     def __len__(self):
         return len(self.__mapping)
@@ -417,15 +863,49 @@ class Context(Mapping):
 
 class Engine:
 
-    def __init__(self, executor):
+    def __init__(self, executor, *, plan_cache_size=None, index_class=Index,
+                 deep_check=True, cache=None):
+        """
+        :param executor: executor to run data loading functions
+        :param plan_cache_size: enables cache of the execution plans for
+                                the specified number of query structures
+        :param index_class: class of the index to store result, for example
+                            :py:class:`~hiku.result.ColumnarIndex`
+        :param deep_check: check every row, returned by the data loading
+                           functions, can be disabled to reduce overhead
+                           of storing large results
+        :param cache: :py:class:`~hiku.cache.CacheBackend` to cache values
+                      of the fields and links with ``cache`` settings
+        """
         self.executor = executor
+        self._index_class = index_class
+        self._deep_check = deep_check
+        self._cache = cache
+        self._limits = ConcurrencyLimits()
+        if plan_cache_size:
+            self._plan_cache = LRUCache(plan_cache_size)
+        else:
+            self._plan_cache = None
+
+    def _get_plan(self, graph, query):
+        if self._plan_cache is None:
+            return None
+        key = (graph, query_shape(query))
+        plan = self._plan_cache.get(key)
+        if plan is None:
+            plan = NodePlan.compile(graph, graph.root, query)
+            self._plan_cache.set(key, plan)
+        return plan
 
     def execute(self, graph, query, ctx=None):
         if ctx is None:
             ctx = {}
         query = InitOptions(graph).visit(query)
-        queue = Queue(self.executor)
+        queue = Queue(self.executor, self._limits)
         task_set = queue.fork(None)
-        query_workflow = Query(queue, task_set, graph, query, Context(ctx))
+        query_workflow = Query(queue, task_set, graph, query, Context(ctx),
+                               self._get_plan(graph, query),
+                               self._index_class, self._deep_check,
+                               self._cache)
         query_workflow.start()
         return self.executor.process(queue, query_workflow)
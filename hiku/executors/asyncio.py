@@ -1,29 +1,104 @@
 import inspect
 
-from asyncio import wait, FIRST_COMPLETED, gather, CancelledError
-from asyncio import get_event_loop
+from asyncio import gather, CancelledError, Semaphore
+from asyncio import get_event_loop, iscoroutinefunction
+from functools import partial
+
+
+def _unwrap(fn):
+    while isinstance(fn, partial):
+        fn = fn.func
+    return fn
+
+
+def _is_coroutine_function(fn):
+    fn = _unwrap(fn)
+    if inspect.isfunction(fn) or inspect.ismethod(fn):
+        return iscoroutinefunction(fn)
+    else:
+        return iscoroutinefunction(getattr(fn, '__call__', None))
 
 
 class AsyncIOExecutor:
+    """Executor to run asynchronous data loading functions
 
-    def __init__(self, loop=None):
+    If ``pool`` argument was provided, then synchronous data loading functions
+    are also supported, they are called using this pool via
+    :py:meth:`~asyncio.AbstractEventLoop.run_in_executor` method, so they
+    wouldn't block event loop. Optional ``source_limit`` argument limits
+    number of concurrent calls in the pool of every such function.
+    """
+    def __init__(self, loop=None, *, pool=None, source_limit=None):
         self._loop = loop or get_event_loop()
+        self._pool = pool
+        self._source_limit = source_limit
+        self._semaphores = {}
+
+    async def _run_in_pool(self, fn, args, kwargs):
+        func = partial(fn, *args, **kwargs)
+        if self._source_limit is None:
+            result = await self._loop.run_in_executor(self._pool, func)
+        else:
+            source = _unwrap(fn)
+            semaphore = self._semaphores.get(source)
+            if semaphore is None:
+                semaphore = self._semaphores[source] = \
+                    Semaphore(self._source_limit)
+            async with semaphore:
+                result = await self._loop.run_in_executor(self._pool, func)
+        # synchronous wrappers may return awaitable objects
+        if inspect.isawaitable(result):
+            result = await result
+        return result
 
     def submit(self, fn, *args, **kwargs):
+        if self._pool is not None and not _is_coroutine_function(fn):
+            return self._loop.create_task(self._run_in_pool(fn, args, kwargs))
+
         coro = fn(*args, **kwargs)
         if not inspect.isawaitable(coro):
             raise TypeError('{!r} returned non-awaitable object {!r}'
                             .format(fn, coro))
         return self._loop.create_task(coro)
 
+    def create_waiter(self):
+        return self._loop.create_future()
+
     async def process(self, queue, workflow):
+        # instead of calling `asyncio.wait` with all pending tasks on every
+        # step, every task gets exactly one done-callback, which drives queue
+        # and signals when there are no more pending tasks
+        finished = self._loop.create_future()
+        pending = 0
+
+        def on_done(task):
+            nonlocal pending
+            pending -= 1
+            if finished.done():
+                return
+            try:
+                queue.progress([task])
+            except (Exception, CancelledError) as e:
+                finished.set_exception(e)
+            else:
+                if not pending:
+                    finished.set_result(None)
+
+        def on_submit(task):
+            nonlocal pending
+            pending += 1
+            task.add_done_callback(on_done)
+
+        for task in queue.__futures__:
+            on_submit(task)
+        queue.add_submit_callback(on_submit)
+
         try:
-            while queue.__futures__:
-                done, _ = await wait(queue.__futures__,
-                                     return_when=FIRST_COMPLETED)
-                queue.progress(done)
+            if pending:
+                await finished
             return workflow.result()
         except CancelledError:
+            queue.discard_waiters()
             for task in queue.__futures__:
                 task.cancel()
             await gather(*queue.__futures__)
@@ -0,0 +1,76 @@
+import pickle
+
+from concurrent.futures import Future
+
+from .threads import ThreadsExecutor
+
+
+def run_in_process(func):
+    """Marks data loading function as suitable to run in a separate process
+
+    Function and it's arguments should be picklable, otherwise
+    :py:class:`ProcessesExecutor` will call this function in-process.
+    Functions decorated with :py:func:`~hiku.engine.pass_context` are always
+    called in-process, because query context isn't meant to be sent into
+    another process.
+    """
+    func.__run_in_process__ = True
+    return func
+
+
+def _do_run_in_process(func):
+    # context isn't meant to be sent into another process, see
+    # hiku.engine.pass_context
+    return (getattr(func, '__run_in_process__', False)
+            and not getattr(func, '__pass_context__', False))
+
+
+def _call_pickled(fn, data):
+    args, kwargs = pickle.loads(data)
+    return fn(*args, **kwargs)
+
+
+class ProcessesExecutor(ThreadsExecutor):
+    """Executor, which calls marked data loading functions using
+    :py:class:`~concurrent.futures.ProcessPoolExecutor`
+
+    Functions should be explicitly marked using :py:func:`run_in_process`
+    decorator, all other functions are called in-process, in the same thread
+    where engine is running.
+    """
+    def __init__(self, pool):
+        super().__init__(pool)
+        self._picklable = {}
+
+    def _is_picklable(self, fn):
+        try:
+            return self._picklable[fn]
+        except KeyError:
+            try:
+                pickle.dumps(fn)
+            except Exception:
+                picklable = False
+            else:
+                picklable = True
+            self._picklable[fn] = picklable
+            return picklable
+
+    def submit(self, fn, *args, **kwargs):
+        if _do_run_in_process(fn) and self._is_picklable(fn):
+            # arguments are different for every call, so instead of checking
+            # them they are pickled only once and sent as bytes
+            try:
+                data = pickle.dumps((args, kwargs), pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                pass
+            else:
+                return self._pool.submit(_call_pickled, fn, data)
+
+        fut = Future()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            fut.set_exception(e)
+        else:
+            fut.set_result(result)
+        return fut
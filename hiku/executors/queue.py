@@ -1,5 +1,5 @@
-from itertools import chain
-from collections import defaultdict
+from threading import Lock
+from collections import defaultdict, deque
 
 
 class Workflow:
@@ -17,53 +17,205 @@ class TaskSet:
         return self._queue.submit(self, fn, *args, **kwargs)
 
 
+# returned from `Queue.submit` instead of a real future, when concurrency limit
+# for the submitted function was reached, real future is submitted when slot
+# is passed to the waiter, created by the executor
+class DeferredFuture:
+    __slots__ = ('_future',)
+
+    def __init__(self):
+        self._future = None
+
+    def result(self):
+        return self._future.result()
+
+
+def _concurrency_limit(fn):
+    limit = getattr(fn, '__concurrency_limit__', None)
+    if limit is None:
+        return None, None
+    else:
+        return getattr(fn, '__concurrency_key__', fn), limit
+
+
+class ConcurrencyLimits:
+    """Numbers of the running calls of the functions with concurrency limit,
+    shared between queues of the concurrently executed queries
+    """
+    def __init__(self):
+        self._lock = Lock()
+        # concurrency key -> number of running calls
+        self._running = defaultdict(int)
+        # concurrency key -> waiters for a free slot
+        self._waiting = defaultdict(deque)
+
+    def acquire(self, key, limit, create_waiter):
+        """Takes a slot and returns ``None``, or returns a waiter, which
+        will be completed when slot is passed to it
+        """
+        with self._lock:
+            if self._running[key] < limit:
+                self._running[key] += 1
+                return None
+            waiter = create_waiter()
+            self._waiting[key].append(waiter)
+            return waiter
+
+    def release(self, key):
+        while True:
+            with self._lock:
+                waiting = self._waiting.get(key)
+                if not waiting:
+                    self._waiting.pop(key, None)
+                    self._running[key] -= 1
+                    if not self._running[key]:
+                        del self._running[key]
+                    return
+                waiter = waiting.popleft()
+            # waiters of the cancelled queries are skipped
+            if not waiter.cancelled():
+                # slot is passed to the waiter
+                waiter.set_result(None)
+                return
+
+    def discard(self, key, waiter):
+        with self._lock:
+            waiting = self._waiting.get(key)
+            if waiting is not None and waiter in waiting:
+                waiting.remove(waiter)
+                return
+        if waiter.done() and not waiter.cancelled():
+            # waiter already owns the slot
+            self.release(key)
+
+
 class Queue:
 
-    def __init__(self, executor):
+    def __init__(self, executor, limits=None):
         self._executor = executor
+        # future -> task set, which owns this future
         self._futures = {}
+        # task set -> parent task set
         self._forks = {}
+        # task set -> number of pending futures and forked task sets
+        self._pending = {}
         self._callbacks = defaultdict(list)
+        self._submit_callbacks = []
+        # task sets, forked since last progress, possibly without any tasks
+        self._idle = []
+        self._limits = ConcurrencyLimits() if limits is None else limits
+        # waiter -> deferred submission
+        self._waiters = {}
+        # future -> deferred future, returned from submit
+        self._deferred = {}
 
     @property
     def __futures__(self):
-        return list(chain.from_iterable(self._futures.values()))
+        return list(self._futures) + list(self._waiters)
+
+    def _release(self, task_set):
+        self._pending[task_set] -= 1
+        if self._pending[task_set]:
+            return
+
+        for callback in self._callbacks.pop(task_set, []):
+            callback()
+        del self._pending[task_set]
+        parent = self._forks.pop(task_set)
+        if parent is not None:
+            self._release(parent)
+
+    def _hold_slot(self, fut, key):
+        add_done_callback = getattr(fut, 'add_done_callback', None)
+        if add_done_callback is None:
+            # future-like objects without callbacks are already completed
+            self._limits.release(key)
+        else:
+            add_done_callback(lambda _: self._limits.release(key))
+
+    def _granted(self, waiter):
+        key, deferred, task_set, fn, args, kwargs = self._waiters.pop(waiter)
+        fut = self._submit(task_set, fn, args, kwargs)
+        self._hold_slot(fut, key)
+        self._deferred[fut] = deferred
+        deferred._future = fut
+
+    def discard_waiters(self):
+        """Gives up waiting for slots, called when query execution failed"""
+        waiters, self._waiters = self._waiters, {}
+        for waiter, (key, *_) in waiters.items():
+            self._limits.discard(key, waiter)
 
     def progress(self, done):
-        for future_set in self._futures.values():
-            future_set.difference_update(done)
+        try:
+            self._progress(done)
+        except BaseException:
+            self.discard_waiters()
+            raise
 
+    def _progress(self, done):
         for fut in done:
+            if fut in self._waiters:
+                self._granted(fut)
+                continue
+            task_set = self._futures.pop(fut)
+            fut = self._deferred.pop(fut, fut)
             for callback in self._callbacks.pop(fut, []):
                 callback()
+            self._release(task_set)
 
-        while True:
-            completed_task_sets = [ts for ts in self._futures.keys()
-                                   if not self._futures[ts] and
-                                   not self._forks[ts]]
-            if not completed_task_sets:
-                break
-
-            for task_set in completed_task_sets:
-                for callback in self._callbacks.pop(task_set, []):
-                    callback()
-                self._futures.pop(task_set)
-                self._forks.pop(task_set)
-                for fork_set in self._forks.values():
-                    fork_set.discard(task_set)
+        while self._idle:
+            idle, self._idle = self._idle, []
+            for task_set in idle:
+                if self._pending.get(task_set) == 0:
+                    # releasing an artificial reference to complete task set
+                    self._pending[task_set] += 1
+                    self._release(task_set)
 
-    def submit(self, task_set, fn, *args, **kwargs):
+    def _submit(self, task_set, fn, args, kwargs):
         fut = self._executor.submit(fn, *args, **kwargs)
-        self._futures[task_set].add(fut)
+        self._futures[fut] = task_set
+        for callback in self._submit_callbacks:
+            callback(fut)
+        return fut
+
+    def submit(self, task_set, fn, *args, **kwargs):
+        key, limit = _concurrency_limit(fn)
+        if key is not None:
+            waiter = self._limits.acquire(key, limit,
+                                          self._executor.create_waiter)
+            if waiter is not None:
+                deferred = DeferredFuture()
+                self._waiters[waiter] = (key, deferred, task_set, fn, args,
+                                         kwargs)
+                self._pending[task_set] += 1
+                for callback in self._submit_callbacks:
+                    callback(waiter)
+                return deferred
+
+        fut = self._submit(task_set, fn, args, kwargs)
+        if key is not None:
+            self._hold_slot(fut, key)
+        self._pending[task_set] += 1
         return fut
 
     def fork(self, from_):
         task_set = TaskSet(self)
-        self._futures[task_set] = set()
-        self._forks[task_set] = set()
+        self._pending[task_set] = 0
+        self._forks[task_set] = from_
         if from_ is not None:
-            self._forks[from_].add(task_set)
+            self._pending[from_] += 1
+        self._idle.append(task_set)
         return task_set
 
     def add_callback(self, obj, callback):
         self._callbacks[obj].append(callback)
+
+    def wait(self, task_set, obj):
+        # task set will not be completed until the future or another task set
+        # is completed
+        self._pending[task_set] += 1
+        self.add_callback(obj, lambda: self._release(task_set))
+
+    def add_submit_callback(self, callback):
+        self._submit_callbacks.append(callback)
@@ -1,8 +1,14 @@
+from concurrent.futures import Future
+
+
 class FutureLike:
 
     def __init__(self, result):
         self._result = result
 
+    def done(self):
+        return True
+
     def result(self):
         return self._result
 
@@ -12,7 +18,17 @@ class SyncExecutor:
     def submit(self, fn, *args, **kwargs):
         return FutureLike(fn(*args, **kwargs))
 
+    def create_waiter(self):
+        return Future()
+
     def process(self, queue, workflow):
         while queue.__futures__:
-            queue.progress(queue.__futures__)
+            futures = queue.__futures__
+            done = [fut for fut in futures if fut.done()]
+            if not done:
+                # only waiters are left, slots for them will be released by
+                # concurrently executed queries
+                futures[0].result()
+                done = [futures[0]]
+            queue.progress(done)
         return workflow.result()
@@ -1,4 +1,5 @@
-from concurrent.futures import wait, FIRST_COMPLETED
+from queue import Queue, Empty
+from concurrent.futures import Future
 
 
 class ThreadsExecutor:
@@ -9,8 +10,32 @@ class ThreadsExecutor:
     def submit(self, fn, *args, **kwargs):
         return self._pool.submit(fn, *args, **kwargs)
 
+    def create_waiter(self):
+        return Future()
+
     def process(self, queue, workflow):
-        while queue.__futures__:
-            done, _ = wait(queue.__futures__, return_when=FIRST_COMPLETED)
+        # completed futures are pushed here from the pool's threads and then
+        # drained in batches, instead of calling `concurrent.futures.wait`
+        # with all pending futures on every step
+        completed = Queue()
+        pending = 0
+
+        def on_submit(fut):
+            nonlocal pending
+            pending += 1
+            fut.add_done_callback(completed.put)
+
+        for fut in queue.__futures__:
+            on_submit(fut)
+        queue.add_submit_callback(on_submit)
+
+        while pending:
+            done = [completed.get()]
+            while True:
+                try:
+                    done.append(completed.get_nowait())
+                except Empty:
+                    break
+            pending -= len(done)
             queue.progress(done)
         return workflow.result()
@@ -0,0 +1,114 @@
+"""
+    hiku.export.normalized
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Serialization of the query result in a normalized form, without
+    denormalization, so every object is serialized only once, no matter how
+    many times it was referenced in the result.
+
+    Result can be read back using :py:mod:`hiku.readers.normalized` module.
+
+"""
+from ..result import Reference
+from ..protobuf import result_pb2
+
+
+def _split(obj):
+    fields, links = {}, {}
+    for key, value in obj.items():
+        if isinstance(value, Reference):
+            links[key] = value
+        elif (
+            isinstance(value, list) and value
+            and isinstance(value[0], Reference)
+        ):
+            links[key] = value
+        else:
+            fields[key] = value
+    return fields, links
+
+
+def _json_ref(ref):
+    return [ref.node, ref.ident]
+
+
+def export_json(result):
+    """Exports result into JSON-compatible structure
+
+    Every node is represented as a list of objects, where every object is a
+    list of it's ident, plain fields and references to other objects, if any:
+
+    .. code-block:: python
+
+        {
+            '__root__': [['__root__', {}, {'user': ['User', 1]}]],
+            'User': [[1, {'name': 'John'}, {'friends': [['User', 2]]}],
+                     [2, {'name': 'Jack'}]],
+        }
+
+    :param result: result of the query
+    :return: JSON-compatible structure
+    """
+    data = {}
+    for node_name, node in result.__idx__.items():
+        objects = data[node_name] = []
+        for ident, obj in node.items():
+            fields, links = _split(obj)
+            if links:
+                objects.append([ident, fields, {
+                    key: (_json_ref(value) if isinstance(value, Reference)
+                          else [_json_ref(ref) for ref in value])
+                    for key, value in links.items()
+                }])
+            else:
+                objects.append([ident, fields])
+    return data
+
+
+def _set_ident(message, ident):
+    if isinstance(ident, str):
+        message.str = ident
+    elif isinstance(ident, int):
+        message.int = ident
+    else:
+        raise TypeError('Unsupported ident type: {!r}'.format(ident))
+
+
+def _set_ref(message, ref):
+    message.node = ref.node
+    _set_ident(message, ref.ident)
+
+
+def export_protobuf(result):
+    """Exports result into Protocol Buffers message, using message types from
+    the ``hiku.protobuf.result`` package.
+
+    Proto-file location: ``hiku/protobuf/result.proto``
+
+    Generated message types: ``hiku.protobuf.result_pb2``
+
+    .. note:: Plain fields are stored using ``google.protobuf.Struct``
+        message type, so all numbers are represented as floats. Objects
+        idents should be strings or integers.
+
+    :param result: result of the query
+    :return: ``hiku.protobuf.result_pb2.Result`` message
+    """
+    message = result_pb2.Result()
+    for node_name, node in result.__idx__.items():
+        pb_node = message.nodes.add()
+        pb_node.name = node_name
+        for ident, obj in node.items():
+            pb_obj = pb_node.objects.add()
+            _set_ident(pb_obj, ident)
+            fields, links = _split(obj)
+            if fields:
+                pb_obj.fields.update(fields)
+            for key, value in links.items():
+                pb_link = pb_obj.links[key]
+                if isinstance(value, Reference):
+                    _set_ref(pb_link.one, value)
+                else:
+                    for ref in value:
+                        _set_ref(pb_link.many.items.add(), ref)
+    return message
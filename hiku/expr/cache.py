@@ -0,0 +1,123 @@
+"""
+    hiku.expr.cache
+    ~~~~~~~~~~~~~~~
+
+    On-disk cache of the checked and compiled expressions, used to speed up
+    graph construction, when graph contains lots of expressions:
+
+    .. code-block:: python
+
+        sg_user = SubGraph(low_level_graph, 'User',
+                           expr_cache=ExprCache('/var/cache/hiku'))
+
+    Cache key is computed from the expression, types of the sub-graph and
+    types of the expression environment, so changed expressions are checked
+    and compiled again. Functions are referenced in the expression by their
+    module and qualified name, so keys are the same in every process.
+
+"""
+import os
+import marshal
+import hashlib
+import tempfile
+
+from importlib.util import MAGIC_NUMBER
+
+from .. import __version__
+from ..edn import dumps
+from ..export.simple import export
+from ..readers.simple import read
+
+from .nodes import NodeTransformer, Symbol
+
+
+def stable_names(functions):
+    """Maps names of the functions to the names, which are the same in every
+    process
+
+    :param functions: functions, returned by :py:func:`~hiku.expr.core.to_expr`
+    """
+    names = {}
+    used = set()
+    for fn in functions:
+        name = fn.__def_qualname__
+        # different functions may have the same qualified name, for example
+        # when they are defined inside another function
+        i = 1
+        while name in used:
+            name = '{}_{}'.format(fn.__def_qualname__, i)
+            i += 1
+        used.add(name)
+        names[fn.__def_name__] = name
+    return names
+
+
+class _Rename(NodeTransformer):
+
+    def __init__(self, names):
+        self.names = names
+
+    def visit_symbol(self, node):
+        return Symbol(self.names.get(node.name, node.name))
+
+
+def rename(expr, names):
+    """Replaces names of the functions in the expression
+
+    :param expr: expression, returned by :py:func:`~hiku.expr.core.to_expr`
+    :param names: mapping, returned by :py:func:`stable_names`
+    """
+    return _Rename(names).visit(expr)
+
+
+def expr_key(types_repr, expr, env, option_names):
+    """Computes cache key of the expression
+
+    :param types_repr: representation of the sub-graph types
+    :param expr: expression, returned by :py:func:`~hiku.expr.core.to_expr`
+    :param env: types of the expression environment
+    :param option_names: names of the field options
+    """
+    key = hashlib.sha256()
+    for value in [__version__, MAGIC_NUMBER.hex(), types_repr, repr(expr),
+                  repr(sorted(env.items())), repr(option_names)]:
+        key.update(value.encode('utf-8'))
+        key.update(b'\0')
+    return key.hexdigest()
+
+
+class ExprCache:
+    """Stores compiled expressions and their requirements in files
+
+    :param path: directory to store files, it will be created if missing
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def _file_path(self, key):
+        return os.path.join(self.path, '{}.bin'.format(key))
+
+    def get(self, key):
+        """Returns a tuple of code object and requirements or ``None``"""
+        try:
+            with open(self._file_path(key), 'rb') as f:
+                code, reqs = marshal.load(f)
+            return code, read(reqs)
+        except FileNotFoundError:
+            return None
+        except (EOFError, ValueError, TypeError):
+            # file is corrupted, expression will be compiled and stored again
+            return None
+
+    def set(self, key, code, reqs):
+        """Stores code object and requirements of the expression"""
+        os.makedirs(self.path, exist_ok=True)
+        data = marshal.dumps((code, dumps(export(reqs))))
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._file_path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
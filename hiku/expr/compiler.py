@@ -1,7 +1,7 @@
 from contextlib import contextmanager
 from collections import Counter
 
-from ..types import CallableMeta
+from ..types import CallableMeta, TypeRefMeta, OptionalMeta, SequenceMeta
 from ..compat import ast as py
 
 from .core import THIS
@@ -164,3 +164,95 @@ class ExpressionCompiler:
         assert all(isinstance(k, Keyword) for k in keys), 'Wrong arguments'
         return py.Dict([py.Str(key.name) for key in keys],
                        [self.visit(value) for value in values])
+
+
+class BatchExpressionCompiler(ExpressionCompiler):
+    """Compiles expression into a function, which evaluates it for a whole
+    batch of objects at once
+
+    Objects of the graph nodes are represented using references, their
+    fields are accessed directly in the index. Objects are wrapped into
+    proxies only when they are passed into the functions or returned
+    """
+    idx_var = 'idx'
+    proxy_var = 'proxy'
+    refs_var = 'refs'
+
+    def __init__(self, nodes):
+        super(BatchExpressionCompiler, self).__init__()
+        self.nodes = nodes
+
+    @classmethod
+    def compile_batch_expr(cls, node, nodes, args=None):
+        args = args or []
+        compiler = cls(nodes)
+        with compiler.env.push([THIS] + args):
+            body = compiler._export(node, compiler.visit(node))
+        py_args = [
+            py.arg(cls.env_var, None),
+            py.arg(cls.idx_var, None),
+            py.arg(cls.proxy_var, None),
+            py.arg(cls.ctx_var, None),
+            py.arg(cls.refs_var, None),
+        ]
+        py_args.extend(py.arg(name, None) for name in args)
+        comp = py.comprehension(py.Name(THIS, py.Store()),
+                                py.Name(cls.refs_var, py.Load()), [], False)
+        expr = py.Lambda(py.arguments([], py_args, None, [], [], None, []),
+                         py.ListComp(body, [comp]))
+        py.fix_missing_locations(expr)
+        return py.Expression(expr)
+
+    def _node_name(self, type_):
+        if isinstance(type_, TypeRefMeta) and type_.__type_name__ in self.nodes:
+            return type_.__type_name__
+        return None
+
+    def _export(self, node, expr):
+        ref = getattr(node, '__ref__', None)
+        if ref is None:
+            return expr
+        type_ = ref.to
+        if isinstance(type_, OptionalMeta):
+            type_ = type_.__type__
+        if isinstance(type_, SequenceMeta):
+            type_ = type_.__item_type__
+        if self._node_name(type_) is None:
+            return expr
+        return py.Call(py.Name(self.proxy_var, py.Load()), [expr], [])
+
+    def visit_get_expr(self, node):
+        _, obj, name = node.values
+        assert isinstance(name, Symbol)
+        obj_expr = self.visit(obj)
+        node_name = self._node_name(obj.__ref__.to)
+        if node_name is not None:
+            obj_ident = py.Attribute(obj_expr, 'ident', py.Load())
+            obj_expr = py.Subscript(
+                py.Subscript(py.Name(self.idx_var, py.Load()),
+                             py.Index(py.Str(node_name)), py.Load()),
+                py.Index(obj_ident), py.Load(),
+            )
+        return py.Subscript(obj_expr, py.Index(py.Str(name.name)), py.Load())
+
+    def visit_tuple(self, node):
+        sym = node.values[0]
+        if sym.name in {'get', 'if', 'if_some', 'each'}:
+            return super(BatchExpressionCompiler, self).visit_tuple(node)
+        else:
+            arg_exprs = [self._export(arg, self.visit(arg))
+                         for arg in node.values[1:]]
+            return py.Call(self.visit(sym), arg_exprs, [])
+
+    def visit_list(self, node):
+        return py.List([self._export(value, self.visit(value))
+                        for value in node.values], py.Load())
+
+    def visit_dict(self, node):
+        assert not len(node.values) % 2, 'Probably missing keyword value'
+        keys = node.values[::2]
+        values = node.values[1::2]
+        assert all(isinstance(k, Keyword) for k in keys), 'Wrong arguments'
+        return py.Dict([py.Str(key.name) for key in keys],
+                       [self._export(value, self.visit(value))
+                        for value in values])
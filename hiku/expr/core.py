@@ -7,7 +7,7 @@
 """
 from functools import wraps
 from itertools import chain
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 
 from ..edn import loads
 from ..query import Node, Link, Field
@@ -49,7 +49,7 @@ def _to_expr(obj, fn_reg):
     if isinstance(obj, _DotHandler):
         return obj.obj
     elif isinstance(obj, _Func):
-        fn_reg.add(obj.expr)
+        fn_reg[obj.expr] = None
         return Tuple([Symbol(obj.expr.__def_name__)] +
                      [_to_expr(arg, fn_reg) for arg in obj.args])
     elif isinstance(obj, list):
@@ -63,7 +63,8 @@ def _to_expr(obj, fn_reg):
 
 
 def to_expr(obj):
-    functions = set([])
+    # functions are ordered by their first occurrence in the expression
+    functions = OrderedDict()
     node = _to_expr(obj, functions)
     return node, tuple(functions)
 
@@ -107,12 +108,14 @@ def define(*types, **kwargs):
         assert not kwargs, repr(kwargs)
 
         name = _name or '{}/{}_{}'.format(fn.__module__, fn.__name__, id(fn))
+        qualname = _name or '{}/{}'.format(fn.__module__, fn.__qualname__)
 
         @wraps(fn)
         def expr(*args):
             return _Func(expr, args)
 
         expr.__def_name__ = name
+        expr.__def_qualname__ = qualname
         expr.__def_body__ = fn
 
         if len(types) == 1 and isinstance(types[0], str):
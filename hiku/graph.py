@@ -12,6 +12,7 @@ from functools import reduce
 from collections import OrderedDict
 
 from .types import OptionalMeta, SequenceMeta, TypeRefMeta, Record, Any
+from .types import Optional, Integer
 from .utils import cached_property, const
 
 
@@ -71,6 +72,72 @@ class Option(AbstractOption):
         return visitor.visit_option(self)
 
 
+class Pagination:
+    """Defines pagination of the link with :py:class:`~hiku.types.Sequence`
+    type
+
+    Link with pagination accepts ``limit`` and ``after`` options. Linked
+    objects are ordered by their identifiers, ``after`` option is a cursor,
+    which contains identifier of the last seen object, so only objects with
+    greater identifiers are returned, no more than ``limit`` objects for
+    every parent object::
+
+        Link('posts', Sequence[TypeRef['post']], user_posts, requires='id',
+             pagination=Pagination(20, max_limit=100))
+
+    Link function receives these options and may compute requested page
+    itself, otherwise engine sorts the returned identifiers and selects this
+    page from them. Negative ``limit`` and ``after`` cursor, which can't be
+    compared with identifiers, are rejected with :py:exc:`TypeError`.
+    """
+    def __init__(self, limit, *, max_limit=None):
+        """
+        :param limit: default number of objects in the page
+        :param max_limit: maximum number of objects, which can be requested
+        """
+        self.limit = limit
+        self.max_limit = max_limit
+
+    def __repr__(self):
+        return '{}({!r}, max_limit={!r})'.format(self.__class__.__name__,
+                                                 self.limit, self.max_limit)
+
+    def options(self):
+        return [
+            Option('limit', Optional[Integer], default=self.limit),
+            Option('after', Optional[Any], default=None),
+        ]
+
+    def init_options(self, options):
+        """Returns options with effective limit"""
+        limit = options['limit']
+        if limit is not None and limit < 0:
+            raise TypeError('Invalid "limit" option value: {!r}, it should '
+                            'be non-negative'.format(limit))
+        if self.max_limit is not None:
+            if limit is None or limit > self.max_limit:
+                limit = self.max_limit
+        if limit != options['limit']:
+            options = dict(options, limit=limit)
+        return options
+
+    def page(self, idents, options):
+        """Selects requested page from the list of identifiers"""
+        idents = sorted(idents)
+        after = options['after']
+        if after is not None:
+            try:
+                idents = [i for i in idents if i > after]
+            except TypeError:
+                raise TypeError('Invalid "after" option value: {!r}, it is '
+                                'not comparable with identifiers'
+                                .format(after))
+        limit = options['limit']
+        if limit is not None and len(idents) > limit:
+            idents = idents[:limit]
+        return idents
+
+
 class AbstractField(AbstractBase):
     pass
 
@@ -109,19 +176,23 @@ class Field(AbstractField):
     - ``ids`` - list node identifiers
 
     """
-    def __init__(self, name, type_, func, *, options=None, description=None):
+    def __init__(self, name, type_, func, *, options=None, description=None,
+                 cache=None):
         """
         :param str name: name of the field
         :param type_: type of the field or ``None``
         :param func: function to load field's data
         :param options: list of acceptable options
         :param description: description of the field
+        :param cache: :py:class:`~hiku.cache.CacheSettings` to cache field's
+                      data
         """
         self.name = name
         self.type = type_
         self.func = func
         self.options = options or ()
         self.description = description
+        self.cache = cache
 
     def __repr__(self):
         return '{}({!r}, {!r}, {!r})'.format(self.__class__.__name__, self.name,
@@ -222,7 +293,8 @@ class Link(AbstractLink):
     options.
     """
     def __init__(
-        self, name, type_, func, *, requires, options=None, description=None
+        self, name, type_, func, *, requires, options=None, description=None,
+        cache=None, pagination=None
     ):
         """
         :param name: name of the link
@@ -232,17 +304,32 @@ class Link(AbstractLink):
                          identifiers of the linked node
         :param options: list of acceptable options
         :param description: description of the link
+        :param cache: :py:class:`~hiku.cache.CacheSettings` to cache
+                      identifiers of the linked node
+        :param pagination: :py:class:`Pagination` to add ``limit`` and
+                           ``after`` options to the link
         """
         type_enum, node = get_type_enum(type_)
 
+        options = list(options or ())
+        if pagination is not None:
+            if type_enum is not Many:
+                raise TypeError('Pagination is supported only for links with '
+                                'Sequence type: {!r}'.format(name))
+            names = {opt.name for opt in options}
+            options.extend(opt for opt in pagination.options()
+                           if opt.name not in names)
+
         self.name = name
         self.type = type_
         self.type_enum = type_enum
         self.node = node
         self.func = func
         self.requires = requires
-        self.options = options or ()
+        self.options = options
         self.description = description
+        self.cache = cache
+        self.pagination = pagination
 
     def __repr__(self):
         return '{}({!r}, {!r}, {!r}, ...)'.format(self.__class__.__name__,
@@ -458,13 +545,14 @@ class GraphTransformer(AbstractGraphVisitor):
     def visit_field(self, obj):
         return Field(obj.name, obj.type, obj.func,
                      options=[self.visit(op) for op in obj.options],
-                     description=obj.description)
+                     description=obj.description, cache=obj.cache)
 
     def visit_link(self, obj):
         return Link(obj.name, obj.type, obj.func,
                     requires=obj.requires,
                     options=[self.visit(op) for op in obj.options],
-                    description=obj.description)
+                    description=obj.description, cache=obj.cache,
+                    pagination=obj.pagination)
 
     def visit_node(self, obj):
         return Node(obj.name, [self.visit(f) for f in obj.fields],
@@ -0,0 +1,397 @@
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: hiku/protobuf/result.proto
+
+import sys
+_b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from google.protobuf import reflection as _reflection
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import struct_pb2 as google_dot_protobuf_dot_struct__pb2
+
+
+DESCRIPTOR = _descriptor.FileDescriptor(
+  name='hiku/protobuf/result.proto',
+  package='hiku.protobuf.result',
+  syntax='proto3',
+  serialized_options=None,
+  serialized_pb=_b('\n\x1ahiku/protobuf/result.proto\x12\x14hiku.protobuf.result\x1a\x1cgoogle/protobuf/struct.proto\"@\n\tReference\x12\x0c\n\x04node\x18\x01 \x01(\t\x12\r\n\x03str\x18\x02 \x01(\tH\x00\x12\r\n\x03int\x18\x03 \x01(\x12H\x00\x42\x07\n\x05ident\"<\n\nReferences\x12.\n\x05items\x18\x01 \x03(\x0b\x32\x1f.hiku.protobuf.result.Reference\"q\n\x04Link\x12.\n\x03one\x18\x01 \x01(\x0b\x32\x1f.hiku.protobuf.result.ReferenceH\x00\x12\x30\n\x04many\x18\x02 \x01(\x0b\x32 .hiku.protobuf.result.ReferencesH\x00\x42\x07\n\x05value\"\xda\x01\n\x06Object\x12\r\n\x03str\x18\x01 \x01(\tH\x00\x12\r\n\x03int\x18\x02 \x01(\x12H\x00\x12\'\n\x06\x66ields\x18\x03 \x01(\x0b\x32\x17.google.protobuf.Struct\x12\x36\n\x05links\x18\x04 \x03(\x0b\x32\'.hiku.protobuf.result.Object.LinksEntry\x1aH\n\nLinksEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12)\n\x05value\x18\x02 \x01(\x0b\x32\x1a.hiku.protobuf.result.Link:\x02\x38\x01\x42\x07\n\x05ident\"C\n\x04Node\x12\x0c\n\x04name\x18\x01 \x01(\t\x12-\n\x07objects\x18\x02 \x03(\x0b\x32\x1c.hiku.protobuf.result.Object\"3\n\x06Result\x12)\n\x05nodes\x18\x01 \x03(\x0b\x32\x1a.hiku.protobuf.result.Nodeb\x06proto3')
+  ,
+  dependencies=[google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,])
+
+
+
+_REFERENCE = _descriptor.Descriptor(
+  name='Reference',
+  full_name='hiku.protobuf.result.Reference',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='node', full_name='hiku.protobuf.result.Reference.node', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='str', full_name='hiku.protobuf.result.Reference.str', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='int', full_name='hiku.protobuf.result.Reference.int', index=2,
+      number=3, type=18, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='ident', full_name='hiku.protobuf.result.Reference.ident',
+      index=0, containing_type=None, fields=[]),
+  ],
+  serialized_start=82,
+  serialized_end=146,
+)
+
+
+_REFERENCES = _descriptor.Descriptor(
+  name='References',
+  full_name='hiku.protobuf.result.References',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='items', full_name='hiku.protobuf.result.References.items', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=148,
+  serialized_end=208,
+)
+
+
+_LINK = _descriptor.Descriptor(
+  name='Link',
+  full_name='hiku.protobuf.result.Link',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='one', full_name='hiku.protobuf.result.Link.one', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='many', full_name='hiku.protobuf.result.Link.many', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='value', full_name='hiku.protobuf.result.Link.value',
+      index=0, containing_type=None, fields=[]),
+  ],
+  serialized_start=210,
+  serialized_end=323,
+)
+
+
+_OBJECT_LINKSENTRY = _descriptor.Descriptor(
+  name='LinksEntry',
+  full_name='hiku.protobuf.result.Object.LinksEntry',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='key', full_name='hiku.protobuf.result.Object.LinksEntry.key', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='value', full_name='hiku.protobuf.result.Object.LinksEntry.value', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=_b('8\001'),
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=463,
+  serialized_end=535,
+)
+
+
+_OBJECT = _descriptor.Descriptor(
+  name='Object',
+  full_name='hiku.protobuf.result.Object',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='str', full_name='hiku.protobuf.result.Object.str', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='int', full_name='hiku.protobuf.result.Object.int', index=1,
+      number=2, type=18, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='fields', full_name='hiku.protobuf.result.Object.fields', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='links', full_name='hiku.protobuf.result.Object.links', index=3,
+      number=4, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[_OBJECT_LINKSENTRY, ],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='ident', full_name='hiku.protobuf.result.Object.ident',
+      index=0, containing_type=None, fields=[]),
+  ],
+  serialized_start=326,
+  serialized_end=544,
+)
+
+
+_NODE = _descriptor.Descriptor(
+  name='Node',
+  full_name='hiku.protobuf.result.Node',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='hiku.protobuf.result.Node.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='objects', full_name='hiku.protobuf.result.Node.objects', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=546,
+  serialized_end=613,
+)
+
+
+_RESULT = _descriptor.Descriptor(
+  name='Result',
+  full_name='hiku.protobuf.result.Result',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='nodes', full_name='hiku.protobuf.result.Result.nodes', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=615,
+  serialized_end=666,
+)
+
+_REFERENCE.oneofs_by_name['ident'].fields.append(
+  _REFERENCE.fields_by_name['str'])
+_REFERENCE.fields_by_name['str'].containing_oneof = _REFERENCE.oneofs_by_name['ident']
+_REFERENCE.oneofs_by_name['ident'].fields.append(
+  _REFERENCE.fields_by_name['int'])
+_REFERENCE.fields_by_name['int'].containing_oneof = _REFERENCE.oneofs_by_name['ident']
+_REFERENCES.fields_by_name['items'].message_type = _REFERENCE
+_LINK.fields_by_name['one'].message_type = _REFERENCE
+_LINK.fields_by_name['many'].message_type = _REFERENCES
+_LINK.oneofs_by_name['value'].fields.append(
+  _LINK.fields_by_name['one'])
+_LINK.fields_by_name['one'].containing_oneof = _LINK.oneofs_by_name['value']
+_LINK.oneofs_by_name['value'].fields.append(
+  _LINK.fields_by_name['many'])
+_LINK.fields_by_name['many'].containing_oneof = _LINK.oneofs_by_name['value']
+_OBJECT_LINKSENTRY.fields_by_name['value'].message_type = _LINK
+_OBJECT_LINKSENTRY.containing_type = _OBJECT
+_OBJECT.fields_by_name['fields'].message_type = google_dot_protobuf_dot_struct__pb2._STRUCT
+_OBJECT.fields_by_name['links'].message_type = _OBJECT_LINKSENTRY
+_OBJECT.oneofs_by_name['ident'].fields.append(
+  _OBJECT.fields_by_name['str'])
+_OBJECT.fields_by_name['str'].containing_oneof = _OBJECT.oneofs_by_name['ident']
+_OBJECT.oneofs_by_name['ident'].fields.append(
+  _OBJECT.fields_by_name['int'])
+_OBJECT.fields_by_name['int'].containing_oneof = _OBJECT.oneofs_by_name['ident']
+_NODE.fields_by_name['objects'].message_type = _OBJECT
+_RESULT.fields_by_name['nodes'].message_type = _NODE
+DESCRIPTOR.message_types_by_name['Reference'] = _REFERENCE
+DESCRIPTOR.message_types_by_name['References'] = _REFERENCES
+DESCRIPTOR.message_types_by_name['Link'] = _LINK
+DESCRIPTOR.message_types_by_name['Object'] = _OBJECT
+DESCRIPTOR.message_types_by_name['Node'] = _NODE
+DESCRIPTOR.message_types_by_name['Result'] = _RESULT
+_sym_db.RegisterFileDescriptor(DESCRIPTOR)
+
+Reference = _reflection.GeneratedProtocolMessageType('Reference', (_message.Message,), dict(
+  DESCRIPTOR = _REFERENCE,
+  __module__ = 'hiku.protobuf.result_pb2'
+  # @@protoc_insertion_point(class_scope:hiku.protobuf.result.Reference)
+  ))
+_sym_db.RegisterMessage(Reference)
+
+References = _reflection.GeneratedProtocolMessageType('References', (_message.Message,), dict(
+  DESCRIPTOR = _REFERENCES,
+  __module__ = 'hiku.protobuf.result_pb2'
+  # @@protoc_insertion_point(class_scope:hiku.protobuf.result.References)
+  ))
+_sym_db.RegisterMessage(References)
+
+Link = _reflection.GeneratedProtocolMessageType('Link', (_message.Message,), dict(
+  DESCRIPTOR = _LINK,
+  __module__ = 'hiku.protobuf.result_pb2'
+  # @@protoc_insertion_point(class_scope:hiku.protobuf.result.Link)
+  ))
+_sym_db.RegisterMessage(Link)
+
+Object = _reflection.GeneratedProtocolMessageType('Object', (_message.Message,), dict(
+
+  LinksEntry = _reflection.GeneratedProtocolMessageType('LinksEntry', (_message.Message,), dict(
+    DESCRIPTOR = _OBJECT_LINKSENTRY,
+    __module__ = 'hiku.protobuf.result_pb2'
+    # @@protoc_insertion_point(class_scope:hiku.protobuf.result.Object.LinksEntry)
+    ))
+  ,
+  DESCRIPTOR = _OBJECT,
+  __module__ = 'hiku.protobuf.result_pb2'
+  # @@protoc_insertion_point(class_scope:hiku.protobuf.result.Object)
+  ))
+_sym_db.RegisterMessage(Object)
+_sym_db.RegisterMessage(Object.LinksEntry)
+
+Node = _reflection.GeneratedProtocolMessageType('Node', (_message.Message,), dict(
+  DESCRIPTOR = _NODE,
+  __module__ = 'hiku.protobuf.result_pb2'
+  # @@protoc_insertion_point(class_scope:hiku.protobuf.result.Node)
+  ))
+_sym_db.RegisterMessage(Node)
+
+Result = _reflection.GeneratedProtocolMessageType('Result', (_message.Message,), dict(
+  DESCRIPTOR = _RESULT,
+  __module__ = 'hiku.protobuf.result_pb2'
+  # @@protoc_insertion_point(class_scope:hiku.protobuf.result.Result)
+  ))
+_sym_db.RegisterMessage(Result)
+
+
+_OBJECT_LINKSENTRY._options = None
+# @@protoc_insertion_point(module_scope)
@@ -358,6 +358,10 @@ def read_operation(src, variables=None, operation_name=None):
     """
     doc = parse(src)
     op = OperationGetter.get(doc, operation_name=operation_name)
+    return _read_operation(doc, op, variables)
+
+
+def _read_operation(doc, op, variables):
     query = GraphQLTransformer.transform(doc, op, variables)
     type_ = OperationType._value2member_map_.get(op.operation)
     name = op.name.value if op.name else None
@@ -0,0 +1,78 @@
+"""
+    hiku.readers.normalized
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Reading of the query result, serialized in a normalized form using
+    :py:mod:`hiku.export.normalized` module
+
+"""
+from google.protobuf.json_format import MessageToDict
+
+from ..result import Index, Proxy, Reference, ROOT
+from ..protobuf import result_pb2
+
+
+def _json_ident(value):
+    # JSON has no tuples, they are serialized as lists
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _json_ref(value):
+    node, ident = value
+    return Reference(node, _json_ident(ident))
+
+
+def read_json(data, query):
+    """Reads result, exported using
+    :py:func:`~hiku.export.normalized.export_json` function
+
+    :param data: decoded JSON-compatible structure
+    :param query: :py:class:`hiku.query.Node`, query of the result
+    :return: :py:class:`hiku.result.Proxy` object
+    """
+    index = Index()
+    for node_name, objects in data.items():
+        node = index[node_name]
+        for item in objects:
+            obj = node[_json_ident(item[0])]
+            obj.update(item[1])
+            if len(item) > 2:
+                for key, value in item[2].items():
+                    if value and isinstance(value[0], list):
+                        obj[key] = [_json_ref(i) for i in value]
+                    else:
+                        obj[key] = _json_ref(value)
+    index.finish()
+    return Proxy(index, ROOT, query)
+
+
+def _pb_ident(message):
+    return getattr(message, message.WhichOneof('ident'))
+
+
+def _pb_ref(message):
+    return Reference(message.node, _pb_ident(message))
+
+
+def read_protobuf(data, query):
+    """Reads result, exported using
+    :py:func:`~hiku.export.normalized.export_protobuf` function
+
+    :param bytes data: binary message representation
+    :param query: :py:class:`hiku.query.Node`, query of the result
+    :return: :py:class:`hiku.result.Proxy` object
+    """
+    message = result_pb2.Result.FromString(data)
+    index = Index()
+    for pb_node in message.nodes:
+        node = index[pb_node.name]
+        for pb_obj in pb_node.objects:
+            obj = node[_pb_ident(pb_obj)]
+            obj.update(MessageToDict(pb_obj.fields))
+            for key, pb_link in pb_obj.links.items():
+                if pb_link.WhichOneof('value') == 'one':
+                    obj[key] = _pb_ref(pb_link.one)
+                else:
+                    obj[key] = [_pb_ref(i) for i in pb_link.many.items]
+    index.finish()
+    return Proxy(index, ROOT, query)
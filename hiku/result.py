@@ -18,12 +18,15 @@
         on the client
 
 """
+from itertools import repeat
 from collections import defaultdict
+from collections.abc import Mapping, MutableMapping
 
 from .types import RecordMeta, OptionalMeta, SequenceMeta, get_type
 from .query import Node, Field, Link
 from .graph import Link as GraphLink, Field as GraphField, Many, Maybe
-from .utils import cached_property
+from .graph import One
+from .utils import cached_property, const
 
 
 class Reference:
@@ -40,10 +43,28 @@ class Reference:
 ROOT = Reference('__root__', '__root__')
 
 
+class _IndexNode(defaultdict):
+
+    def __init__(self):
+        super(_IndexNode, self).__init__(dict)
+
+    def store(self, ids, names, rows):
+        if self.keys().isdisjoint(ids):
+            # fast path, when all objects are new
+            self.update(zip(ids, map(dict, map(zip, repeat(names), rows))))
+        else:
+            for i, row in zip(ids, rows):
+                self[i].update(zip(names, row))
+
+    def store_column(self, ids, name, values):
+        for i, value in zip(ids, values):
+            self[i][name] = value
+
+
 class Index(defaultdict):
 
     def __init__(self):
-        super(Index, self).__init__(lambda: defaultdict(dict))
+        super(Index, self).__init__(_IndexNode)
 
     @cached_property
     def root(self):
@@ -55,6 +76,135 @@ class Index(defaultdict):
         self.default_factory = None
 
 
+_Missing = const('_Missing')
+
+
+class _ColumnarRow(MutableMapping):
+    __slots__ = ('_node', '_row')
+
+    def __init__(self, node, row):
+        self._node = node
+        self._row = row
+
+    def __getitem__(self, key):
+        column = self._node.columns[key]
+        if self._row < len(column):
+            value = column[self._row]
+            if value is not _Missing:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._node.column(key)[self._row] = value
+
+    def __delitem__(self, key):
+        self[key]  # raises KeyError for missing values
+        self._node.columns[key][self._row] = _Missing
+
+    def __iter__(self):
+        row = self._row
+        for key, column in self._node.columns.items():
+            if row < len(column) and column[row] is not _Missing:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _ColumnarNode(Mapping):
+    __slots__ = ('rows', 'columns')
+
+    def __init__(self):
+        self.rows = {}
+        self.columns = {}
+
+    def row(self, ident):
+        row = self.rows.get(ident)
+        if row is None:
+            row = self.rows[ident] = len(self.rows)
+        return row
+
+    def column(self, name):
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = []
+        if len(column) < len(self.rows):
+            column.extend(repeat(_Missing, len(self.rows) - len(column)))
+        return column
+
+    def __getitem__(self, ident):
+        return _ColumnarRow(self, self.rows[ident])
+
+    def __contains__(self, ident):
+        return ident in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _store_column(self, start, rows, name, values):
+        column = self.columns.get(name)
+        if rows is None and (column is None or len(column) <= start):
+            # all ids are new and stored in a continuous range of rows
+            if column is None:
+                column = self.columns[name] = []
+            column.extend(repeat(_Missing, start - len(column)))
+            column.extend(values)
+        else:
+            if rows is None:
+                rows = range(start, start + len(values))
+            column = self.column(name)
+            for row, value in zip(rows, values):
+                column[row] = value
+
+    def _rows(self, ids):
+        start = len(self.rows)
+        rows = [self.row(i) for i in ids]
+        if len(self.rows) - start == len(rows):
+            rows = None
+        return start, rows
+
+    def store(self, ids, names, rows):
+        start, row_numbers = self._rows(ids)
+        for name, values in zip(names, zip(*rows)):
+            self._store_column(start, row_numbers, name, values)
+
+    def store_column(self, ids, name, values):
+        start, row_numbers = self._rows(ids)
+        self._store_column(start, row_numbers, name, list(values))
+
+
+class ColumnarIndex(defaultdict):
+    """Alternative index, which stores fields values in columns
+
+    Every node is stored as a mapping of object idents to row numbers and a
+    list of values for every field, instead of a separate dict for every
+    object. This reduces memory usage and speeds up storing of the large
+    results. Objects from this index are accessed in the same way as from the
+    default index, so it can be used as a drop-in replacement:
+
+    .. code-block:: python
+
+        engine = Engine(executor, index_class=ColumnarIndex)
+
+    """
+    def __init__(self):
+        super(ColumnarIndex, self).__init__(_ColumnarNode)
+
+    @cached_property
+    def root(self):
+        node = self[ROOT.node]
+        return _ColumnarRow(node, node.row(ROOT.ident))
+
+    def finish(self):
+        self.default_factory = None
+
+
 class Proxy:
     __slots__ = ('__idx__', '__ref__', '__node__')
 
@@ -102,6 +252,135 @@ class Proxy:
             raise AttributeError(e)
 
 
+_Dynamic = const('_Dynamic')
+
+
+def _compile_accessors(graph, graph_node, node):
+    accessors = {}
+    for field in node.fields:
+        if isinstance(field, Field):
+            accessors[field.result_key] = (field.index_key, None, None, None)
+            continue
+        graph_obj = None
+        if graph_node is not None:
+            graph_obj = graph_node.fields_map.get(field.name)
+        if isinstance(graph_obj, GraphLink):
+            link_node = graph.nodes_map[graph_obj.node]
+            accessors[field.result_key] = (
+                field.index_key, graph_obj.type_enum, field.node,
+                _compile_accessors(graph, link_node, field.node),
+            )
+        elif graph_obj is None:
+            # type of the link is unknown, it is checked for every value,
+            # like in the Proxy
+            accessors[field.result_key] = (
+                field.index_key, _Dynamic, field.node,
+                _compile_accessors(graph, None, field.node),
+            )
+        else:
+            # complex field
+            accessors[field.result_key] = (field.index_key, None, None, None)
+    return accessors
+
+
+class CompiledProxy:
+    """Drop-in replacement for the :py:class:`Proxy`, which precomputes how
+    every field of the query should be accessed
+
+    Index keys and kinds of the links (one, maybe or many) are computed once
+    for every query node, so fields access is reduced to the direct reads
+    from the index:
+
+    .. code-block:: python
+
+        result = engine.execute(graph, query)
+        result = CompiledProxy(result.__idx__, result.__ref__,
+                               result.__node__, graph=graph)
+
+    :param index: index with result
+    :param reference: reference to the object in the index
+    :param node: query node
+    :param graph: :py:class:`~hiku.graph.Graph` definition, used to find
+                  kinds of the links, without graph links are checked like in
+                  the :py:class:`Proxy`
+    """
+    __slots__ = ('__idx__', '__ref__', '__node__', '_accessors', '_obj')
+
+    def __init__(self, index, reference, node, *, graph=None):
+        if graph is None:
+            graph_node = None
+        elif reference.node == ROOT.node:
+            graph_node = graph.root
+        else:
+            graph_node = graph.nodes_map[reference.node]
+        self.__idx__ = index
+        self.__ref__ = reference
+        self.__node__ = node
+        self._accessors = _compile_accessors(graph, graph_node, node)
+        self._obj = None
+
+    @classmethod
+    def _create(cls, index, reference, node, accessors):
+        proxy = cls.__new__(cls)
+        proxy.__idx__ = index
+        proxy.__ref__ = reference
+        proxy.__node__ = node
+        proxy._accessors = accessors
+        proxy._obj = None
+        return proxy
+
+    def __getitem__(self, item):
+        try:
+            index_key, kind, node, accessors = self._accessors[item]
+        except KeyError:
+            raise KeyError("Field {!r} wasn't requested in the query"
+                           .format(item))
+
+        obj = self._obj
+        if obj is None:
+            try:
+                obj = self._obj = \
+                    self.__idx__[self.__ref__.node][self.__ref__.ident]
+            except KeyError:
+                raise AssertionError('Object {}[{!r}] is missing in the index'
+                                     .format(self.__ref__.node,
+                                             self.__ref__.ident))
+        try:
+            value = obj[index_key]
+        except KeyError:
+            raise AssertionError('Field {}[{!r}].{} is missing in the index'
+                                 .format(self.__ref__.node, self.__ref__.ident,
+                                         index_key))
+
+        if kind is None:
+            return value
+        create = self._create
+        index = self.__idx__
+        if kind is Many:
+            return [create(index, ref, node, accessors) for ref in value]
+        elif kind is One:
+            return create(index, value, node, accessors)
+        elif kind is Maybe:
+            if value is None:
+                return None
+            return create(index, value, node, accessors)
+        elif isinstance(value, Reference):
+            return create(index, value, node, accessors)
+        elif (
+            isinstance(value, list) and value
+            and isinstance(value[0], Reference)
+        ):
+            return [create(index, ref, node, accessors) for ref in value]
+        else:
+            return value
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError as e:
+            raise AttributeError(e)
+
+
 def _denormalize_type(type_, result, query_obj):
     if isinstance(query_obj, Field):
         return result
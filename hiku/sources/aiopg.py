@@ -7,50 +7,77 @@ from . import sqlalchemy as _sa
 FETCH_SIZE = 100
 
 
-class FieldsQuery(_sa.FieldsQuery):
+async def _fetch_all(result, size):
+    rows = []
+    while True:
+        bucket = await result.fetchmany(size)
+        if bucket:
+            rows.extend(bucket)
+        else:
+            return rows
 
-    def in_impl(self, column, values):
-        return column == any_(values)
 
-    async def __call__(self, ctx, fields_, ids):
-        if not ids:
-            return []
+class RequestConnections(_sa.AsyncRequestConnections):
+    """Request-scoped set of connections, see
+    :py:class:`hiku.sources.sqlalchemy.RequestConnections`
+
+    .. code-block:: python
+
+        async with RequestConnections(sa_engine) as connections:
+            result = await engine.execute(graph, query,
+                                          {'sa-engine': connections})
+
+    :param sa_engine: ``aiopg.sa`` engine
+    :param max_size: maximum number of connections, by default new
+                     connection is acquired when all connections are in use
+    :param isolation_level: begins transaction with this isolation level
+    :param read_only: begins read-only transaction
+    """
+    def __init__(self, sa_engine, *, max_size=None, isolation_level=None,
+                 read_only=False):
+        super().__init__(max_size=max_size, isolation_level=isolation_level,
+                         read_only=read_only)
+        self.sa_engine = sa_engine
+
+    async def _open(self):
+        connection = await self.sa_engine.acquire()
+        transaction = None
+        if self.isolation_level is not None or self.read_only:
+            transaction = await connection.begin(
+                isolation_level=self.isolation_level,
+                readonly=self.read_only,
+            )
+        return connection, transaction
+
+    async def _close(self, connection, transaction):
+        if transaction is not None:
+            # nothing to commit, queries are only reading data
+            await transaction.rollback()
+        await self.sa_engine.release(connection)
 
-        expr, result_proc = self.select_expr(fields_, ids)
 
-        sa_engine = ctx[self.engine_key]
+class FieldsQuery(_sa.AsyncFieldsQuery):
+
+    def in_impl(self, column, values):
+        return column == any_(values)
+
+    async def _execute(self, sa_engine, fields_, ids, prefetched):
+        expr, result_proc = self.select_expr(fields_, ids, prefetched)
+        fetch_size = self.fetch_size or FETCH_SIZE
         async with sa_engine.acquire() as connection:
             res = await connection.execute(expr)
-            rows = []
-            while True:
-                bucket = await res.fetchmany(FETCH_SIZE)
-                if bucket:
-                    rows.extend(bucket)
-                else:
-                    break
-
+            rows = await _fetch_all(res, fetch_size)
         return result_proc(rows)
 
 
-class LinkQuery(_sa.LinkQuery):
+class LinkQuery(_sa.AsyncLinkQuery):
 
     def in_impl(self, column, values):
         return column == any_(values)
 
-    async def __call__(self, result_proc, ctx, ids):
-        expr = self.select_expr(ids)
-        if expr is None:
-            pairs = []
-        else:
-            sa_engine = ctx[self.engine_key]
-            async with sa_engine.acquire() as connection:
-                res = await connection.execute(expr)
-                rows = []
-                while True:
-                    bucket = await res.fetchmany(FETCH_SIZE)
-                    if bucket:
-                        rows.extend(bucket)
-                    else:
-                        break
-            pairs = [(r.from_column, r.to_column) for r in rows]
-        return result_proc(pairs, ids)
+    async def _execute(self, sa_engine, ids, options):
+        expr = self.select_expr(ids, options)
+        async with sa_engine.acquire() as connection:
+            res = await connection.execute(expr)
+            rows = await _fetch_all(res, FETCH_SIZE)
+        return [(r.from_column, r.to_column) for r in rows]
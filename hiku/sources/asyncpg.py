@@ -0,0 +1,160 @@
+"""
+    hiku.sources.asyncpg
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Data sources for the asyncpg_ library, which are using the same
+    SQLAlchemy expressions as :py:mod:`hiku.sources.sqlalchemy`, but instead
+    of compiling them for every call, they are compiled once for every
+    requested set of fields. Identifiers are passed as a single array
+    parameter, so asyncpg caches prepared statements for every connection
+    and decodes rows using binary protocol.
+
+    Context should contain asyncpg's pool or
+    :py:class:`RequestConnections`:
+
+    .. code-block:: python
+
+        pool = await asyncpg.create_pool(dsn)
+        result = await engine.execute(graph, query, {'pg-pool': pool})
+
+    .. _asyncpg: https://magicstack.github.io/asyncpg/
+
+"""
+from sqlalchemy import any_, bindparam
+from sqlalchemy.dialects import postgresql
+
+from . import sqlalchemy as _sa
+
+
+_dialect = postgresql.dialect(paramstyle='format')
+
+
+class _Statement:
+
+    def __init__(self, expr):
+        compiled = expr.compile(dialect=_dialect)
+        self.names = compiled.positiontup
+        self.defaults = compiled.params
+        self.sql = compiled.string % tuple(
+            '${}'.format(i) for i in range(1, len(self.names) + 1)
+        )
+
+    def args(self, **values):
+        return [values[name] if name in values else self.defaults[name]
+                for name in self.names]
+
+
+class RequestConnections(_sa.AsyncRequestConnections):
+    """Request-scoped set of connections, see
+    :py:class:`hiku.sources.sqlalchemy.RequestConnections`
+
+    .. code-block:: python
+
+        async with RequestConnections(pool) as connections:
+            result = await engine.execute(graph, query,
+                                          {'pg-pool': connections})
+
+    :param pool: asyncpg's pool
+    :param max_size: maximum number of connections, by default new
+                     connection is acquired when all connections are in use
+    :param isolation_level: begins transaction with this isolation level,
+                            for example ``'repeatable_read'``
+    :param read_only: begins read-only transaction
+    """
+    def __init__(self, pool, *, max_size=None, isolation_level=None,
+                 read_only=False):
+        super().__init__(max_size=max_size, isolation_level=isolation_level,
+                         read_only=read_only)
+        self.pool = pool
+
+    async def _open(self):
+        connection = await self.pool.acquire()
+        transaction = None
+        if self.isolation_level is not None or self.read_only:
+            transaction = connection.transaction(
+                isolation=self.isolation_level or 'read_committed',
+                readonly=self.read_only,
+            )
+            await transaction.start()
+        return connection, transaction
+
+    async def _close(self, connection, transaction):
+        if transaction is not None:
+            # nothing to commit, queries are only reading data
+            await transaction.rollback()
+        await self.pool.release(connection)
+
+
+class FieldsQuery(_sa.AsyncFieldsQuery):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._statements = {}
+
+    def in_impl(self, column, values):
+        return column == any_(values)
+
+    def statement(self, fields_, prefetched):
+        links = tuple(lq for lq, _ in prefetched) if prefetched else ()
+        key = (tuple(f.name for f in fields_), links)
+        try:
+            return self._statements[key]
+        except KeyError:
+            expr, _ = self.select_expr(fields_, bindparam('ids'), prefetched)
+            _, positions = self.select_columns(fields_, links)
+            statement = self._statements[key] = (_Statement(expr), positions)
+            return statement
+
+    async def _execute(self, pool, fields_, ids, prefetched):
+        statement, positions = self.statement(fields_, prefetched)
+        args = statement.args(ids=list(ids))
+        async with pool.acquire() as connection:
+            if self.fetch_size is None:
+                rows = await connection.fetch(statement.sql, *args)
+            else:
+                rows = []
+                # server-side cursors can be used only inside transaction
+                async with connection.transaction():
+                    cursor = connection.cursor(statement.sql, *args,
+                                               prefetch=self.fetch_size)
+                    async for row in cursor:
+                        rows.append(row)
+        return self.process_rows(fields_, ids, positions, rows, prefetched)
+
+
+class LinkQuery(_sa.AsyncLinkQuery):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._statements = {}
+
+    def in_impl(self, column, values):
+        return column == any_(values)
+
+    def statement(self, page, after, limit):
+        key = (page, after, limit)
+        try:
+            return self._statements[key]
+        except KeyError:
+            expr = self.pairs_expr(
+                bindparam('ids'), page=page,
+                after=bindparam('after') if after else None,
+                limit=bindparam('limit') if limit else None,
+            )
+            statement = self._statements[key] = _Statement(expr)
+            return statement
+
+    async def _execute(self, pool, ids, options):
+        values = {'ids': ids}
+        if options is None:
+            statement = self.statement(False, False, False)
+        else:
+            values.update(after=options.get('after'),
+                          limit=options.get('limit'))
+            statement = self.statement(True, values['after'] is not None,
+                                       values['limit'] is not None)
+
+        async with pool.acquire() as connection:
+            records = await connection.fetch(statement.sql,
+                                             *statement.args(**values))
+        return [(r[0], r[1]) for r in records]
@@ -1,4 +1,5 @@
 from functools import partial
+from collections import defaultdict
 
 from .. import query
 from ..graph import Link, Nothing
@@ -9,15 +10,48 @@ from ..engine import Query
 from ..expr.refs import RequirementsExtractor
 from ..expr.core import to_expr, S, THIS
 from ..expr.checker import check, fn_types
-from ..expr.compiler import ExpressionCompiler
+from ..expr.compiler import BatchExpressionCompiler
+from ..expr.cache import expr_key, stable_names, rename
+from ..utils import cached_property
+from ..result import Proxy, ROOT
 
 
-def _create_result_proc(engine_query, procs, options):
+def _collect_query_nodes(graph, graph_node, query_node, acc):
+    acc[graph_node.name].append(query_node)
+    for query_link in query_node.fields:
+        if isinstance(query_link, query.Link):
+            graph_link = graph_node.fields_map[query_link.name]
+            if not isinstance(graph_link, Link):
+                # complex field
+                continue
+            _collect_query_nodes(graph, graph.nodes_map[graph_link.node],
+                                 query_link.node, acc)
+
+
+def _query_nodes(graph, node, this_query_node, other_reqs):
+    acc = defaultdict(list)
+    _collect_query_nodes(graph, graph.nodes_map[node], this_query_node, acc)
+    _collect_query_nodes(graph, graph.root, other_reqs, acc)
+    return {name: merge(nodes) for name, nodes in acc.items()}
+
+
+def _create_result_proc(engine_query, procs, options, query_nodes):
     def result_proc():
-        sq_result = engine_query.result()
-        return [[proc(this, sq_result, *opt_args)
-                 for proc, opt_args in zip(procs, options)]
-                for this in sq_result[THIS]]
+        index = engine_query.result().__idx__
+        root = index[ROOT.node][ROOT.ident]
+
+        def proxy(value):
+            if value is None:
+                return None
+            elif isinstance(value, list):
+                return [Proxy(index, ref, query_nodes[ref.node])
+                        for ref in value]
+            else:
+                return Proxy(index, value, query_nodes[value.node])
+
+        columns = [proc(index, proxy, root, root[THIS], *opt_args)
+                   for proc, opt_args in zip(procs, options)]
+        return [list(row) for row in zip(*columns)]
     return result_proc
 
 
@@ -45,23 +79,46 @@ class BoundExpr:
 
     def __postprocess__(self, field):
         expr, funcs = to_expr(self.expr)
+        names = stable_names(funcs)
+        expr = rename(expr, names)
 
-        env = fn_types(funcs)
+        env = {names[name]: type_
+               for name, type_ in fn_types(funcs).items()}
         env.update(self.sub_graph.types['__root__'].__field_types__)
         env.update((opt.name, opt.type or Any) for opt in field.options)
         env[THIS] = TypeRef[self.sub_graph.node]
 
-        expr = check(expr, self.sub_graph.types, env)
+        option_names = [opt.name for opt in field.options]
 
-        option_names_set = set(opt.name for opt in field.options)
-        reqs = RequirementsExtractor.extract(self.sub_graph.types, expr)
-        reqs = query.Node([f for f in reqs.fields
-                           if f.name not in option_names_set])
+        expr_cache = self.sub_graph.expr_cache
+        cached = None
+        if expr_cache is not None:
+            key = expr_key(self.sub_graph.types_repr, expr, env, option_names)
+            cached = expr_cache.get(key)
 
-        option_names = [opt.name for opt in field.options]
-        code = ExpressionCompiler.compile_lambda_expr(expr, option_names)
-        proc = partial(eval(compile(code, '<expr>', 'eval')),
-                       {f.__def_name__: f.__def_body__ for f in funcs})
+        if cached is not None:
+            # expression was already checked, so unchecked expression is
+            # stored in the CheckedExpr
+            code, reqs = cached
+        else:
+            expr = check(expr, self.sub_graph.types, env)
+
+            option_names_set = set(option_names)
+            reqs = RequirementsExtractor.extract(self.sub_graph.types, expr)
+            reqs = query.Node([f for f in reqs.fields
+                               if f.name not in option_names_set])
+
+            nodes = set(self.sub_graph.graph.nodes_map)
+            code = compile(
+                BatchExpressionCompiler.compile_batch_expr(expr, nodes,
+                                                           option_names),
+                '<expr>', 'eval',
+            )
+            if expr_cache is not None:
+                expr_cache.set(key, code, reqs)
+
+        proc = partial(eval(code),
+                       {names[f.__def_name__]: f.__def_body__ for f in funcs})
         field.func = CheckedExpr(self.sub_graph, expr, reqs, proc)
 
     def __call__(self, *args, **kwargs):
@@ -88,10 +145,21 @@ class CheckedExpr:
 
 class SubGraph:
 
-    def __init__(self, graph, node):
+    def __init__(self, graph, node, *, expr_cache=None):
+        """
+        :param graph: low-level graph
+        :param node: name of the node in the low-level graph
+        :param expr_cache: :py:class:`~hiku.expr.cache.ExprCache` to store
+                           checked and compiled expressions
+        """
         self.graph = graph
         self.node = node
         self.types = graph.__types__
+        self.expr_cache = expr_cache
+
+    @cached_property
+    def types_repr(self):
+        return repr(self.types)
 
     def __repr__(self):
         return '<{}: node={!r}>'.format(self.__class__.__name__, self.node)
@@ -116,11 +184,13 @@ class SubGraph:
         other_reqs = query.Node([r for r in reqs.fields
                                  if r.name != THIS])
 
-        q = Query(queue, task_set, self.graph, reqs, ctx)
+        q = Query(queue, task_set, self.graph, reqs, ctx, memoize=True)
         q.process_link(self.graph.root, this_graph_link, this_query_link,
                        None, ids)
         q.process_node(self.graph.root, other_reqs, None)
-        return _create_result_proc(q, procs, option_values)
+        query_nodes = _query_nodes(self.graph, self.node,
+                                   this_query_link.node, other_reqs)
+        return _create_result_proc(q, procs, option_values, query_nodes)
 
     def compile(self, expr):
         return BoundExpr(self, expr)
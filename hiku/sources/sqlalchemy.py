@@ -1,11 +1,15 @@
+import asyncio
+import threading
+
 from functools import partial
-from collections import defaultdict
+from contextlib import contextmanager
+from collections import defaultdict, OrderedDict
 
 import sqlalchemy
 
 from ..types import String, Integer
 from ..graph import Nothing, Maybe, One, Many
-from ..engine import pass_context
+from ..engine import pass_context, limit_concurrency, Context
 
 
 def _translate_type(column):
@@ -24,10 +28,234 @@ def _table_repr(table):
     ))
 
 
+class RequestConnections:
+    """Request-scoped set of connections, which are reused by all
+    :py:class:`FieldsQuery` and :py:class:`LinkQuery` calls during query
+    execution, instead of checking out a connection for every call
+
+    It is stored in the query context instead of the SQLAlchemy engine:
+
+    .. code-block:: python
+
+        with RequestConnections(sa_engine) as connections:
+            result = engine.execute(graph, query, {'sa-engine': connections})
+
+    Connection is used by one data loading function at a time, concurrently
+    running functions are using separate connections. Queries can be
+    executed in transactions with the specified isolation level, for example
+    ``isolation_level='REPEATABLE READ'`` and ``read_only=True`` in
+    PostgreSQL. Every connection has its own transaction and snapshot, so
+    reads are consistent across all queries only with ``max_size=1``, when
+    all queries are executed in a single transaction.
+
+    :param sa_engine: SQLAlchemy engine
+    :param max_size: maximum number of connections, by default new
+                     connection is opened when all connections are in use
+    :param isolation_level: begins transaction with this isolation level
+    :param read_only: begins read-only transaction
+    """
+    def __init__(self, sa_engine, *, max_size=None, isolation_level=None,
+                 read_only=False):
+        self.sa_engine = sa_engine
+        self.max_size = max_size
+        self.isolation_level = isolation_level
+        self.read_only = read_only
+        self._cond = threading.Condition()
+        # number of opened connections and connections being opened
+        self._size = 0
+        self._opened = []
+        self._idle = []
+
+    def _open(self):
+        connection = self.sa_engine.connect()
+        transaction = None
+        if self.isolation_level is not None or self.read_only:
+            if self.isolation_level is not None:
+                connection = connection.execution_options(
+                    isolation_level=self.isolation_level,
+                )
+            transaction = connection.begin()
+            if self.read_only:
+                connection.execute('SET TRANSACTION READ ONLY')
+        return connection, transaction
+
+    def _acquire(self):
+        with self._cond:
+            while (not self._idle and self.max_size is not None
+                   and self._size >= self.max_size):
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            # slot is reserved, so other calls are not blocked while new
+            # connection is opened
+            self._size += 1
+        try:
+            connection, transaction = self._open()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opened.append((connection, transaction))
+        return connection
+
+    @contextmanager
+    def connect(self):
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            with self._cond:
+                self._idle.append(connection)
+                self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            opened, self._opened, self._idle = self._opened, [], []
+            self._size = 0
+        for connection, transaction in opened:
+            if transaction is not None:
+                # nothing to commit, queries are only reading data
+                transaction.rollback()
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _AsyncAcquire:
+
+    def __init__(self, connections):
+        self._connections = connections
+        self._connection = None
+
+    async def __aenter__(self):
+        self._connection = await self._connections._acquire()
+        return self._connection
+
+    async def __aexit__(self, *exc_info):
+        await self._connections._release(self._connection)
+
+
+class AsyncRequestConnections:
+    """Base class of the request-scoped sets of connections for the
+    asynchronous sources, see :py:class:`RequestConnections`
+
+    Subclasses are opening and closing connections and transactions of the
+    specific library.
+    """
+    def __init__(self, *, max_size=None, isolation_level=None,
+                 read_only=False):
+        self.max_size = max_size
+        self.isolation_level = isolation_level
+        self.read_only = read_only
+        self._cond = None
+        # number of opened connections and connections being opened
+        self._size = 0
+        self._opened = []
+        self._idle = []
+
+    async def _open(self):
+        """Returns new connection and transaction or ``None``"""
+        raise NotImplementedError(type(self))
+
+    async def _close(self, connection, transaction):
+        raise NotImplementedError(type(self))
+
+    async def _acquire(self):
+        if self._cond is None:
+            # created lazily to bind it to the running event loop
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            while (not self._idle and self.max_size is not None
+                   and self._size >= self.max_size):
+                await self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            # slot is reserved, so other calls are not blocked while new
+            # connection is opened
+            self._size += 1
+        try:
+            connection, transaction = await self._open()
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._opened.append((connection, transaction))
+        return connection
+
+    async def _release(self, connection):
+        async with self._cond:
+            self._idle.append(connection)
+            self._cond.notify()
+
+    def acquire(self):
+        return _AsyncAcquire(self)
+
+    async def close(self):
+        opened, self._opened, self._idle = self._opened, [], []
+        self._size = 0
+        for connection, transaction in opened:
+            await self._close(connection, transaction)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def _get_prefetched(ctx, links):
+    """Returns links, requested in the query, and their pairs to fill
+
+    Pairs are stored in the engine's context, which is created for every
+    query execution.
+    """
+    if not links or not isinstance(ctx, Context):
+        return None
+    links = [lq for lq in links
+             if not lq._link_names.isdisjoint(ctx.requested_links)]
+    if not links:
+        return None
+    return [(lq, ctx.state.setdefault(lq, {})) for lq in links]
+
+
+def _fetch_many(result, size):
+    while True:
+        rows = result.fetchmany(size)
+        if not rows:
+            break
+        yield from rows
+
+
 @pass_context
 class FieldsQuery:
 
-    def __init__(self, engine_key, from_clause, *, primary_key=None):
+    def __init__(
+        self, engine_key, from_clause, *, primary_key=None,
+        concurrency_limit=None, chunk_size=None, fetch_size=None, links=None
+    ):
+        """
+        :param engine_key: key of the SQLAlchemy engine in the context
+        :param from_clause: table or selectable to fetch fields from
+        :param primary_key: column with objects identifiers, defaults to
+                            the primary key of the ``from_clause``
+        :param concurrency_limit: limits number of concurrently running
+                                  queries, see ``limit_concurrency``
+        :param chunk_size: maximum number of identifiers in one query,
+                           identifiers are split into several queries
+        :param fetch_size: number of rows to fetch at once using server-side
+                           cursor, rows are fetched all at once by default
+        :param links: list of :py:class:`LinkQuery` with ``from_column``
+                      equal to the ``primary_key``, their ``to_column`` is
+                      fetched together with fields, so links are resolved
+                      without additional queries
+        """
         self.engine_key = engine_key
         self.from_clause = from_clause
         if primary_key is not None:
@@ -35,6 +263,16 @@ class FieldsQuery:
         else:
             # currently only one column supported
             self.primary_key, = from_clause.primary_key
+        self.concurrency_limit = concurrency_limit
+        self.chunk_size = chunk_size
+        self.fetch_size = fetch_size
+        self.links = links or []
+        for link_query in self.links:
+            if link_query.from_column is not self.primary_key:
+                raise ValueError('from_column of the {!r} should be the '
+                                 'primary key'.format(link_query))
+        if concurrency_limit is not None:
+            limit_concurrency(concurrency_limit, key=engine_key)(self)
 
     def __repr__(self):
         if isinstance(self.from_clause, sqlalchemy.Table):
@@ -53,34 +291,98 @@ class FieldsQuery:
     def in_impl(self, column, values):
         return column.in_(values)
 
-    def select_expr(self, fields_, ids):
-        columns = [self.from_clause.c[f.name] for f in fields_]
+    def chunks(self, ids):
+        if self.chunk_size is None or len(ids) <= self.chunk_size:
+            return [ids]
+        return [ids[i:i + self.chunk_size]
+                for i in range(0, len(ids), self.chunk_size)]
+
+    def select_columns(self, fields_, links=()):
+        """Returns columns to select and positions of the primary key, fields
+        and links columns in the selected rows"""
+        columns = [self.primary_key]
+        columns.extend(self.from_clause.c[f.name] for f in fields_)
+        columns.extend(lq.to_column for lq in links)
+        # same column is selected only once
+        unique = list(OrderedDict.fromkeys(columns))
+        return unique, [unique.index(c) for c in columns]
+
+    def process_rows(self, fields_, ids, positions, rows, prefetched=None):
+        key_pos = positions[0]
+        fields_pos = positions[1:len(fields_) + 1]
+        if prefetched is not None:
+            links = [(pairs, i) for (_, pairs), i
+                     in zip(prefetched, positions[len(fields_) + 1:])]
+            rows_map = {}
+            for row in rows:
+                ident = row[key_pos]
+                rows_map[ident] = [row[i] for i in fields_pos]
+                for pairs, i in links:
+                    pairs[ident] = row[i]
+        else:
+            rows_map = {row[key_pos]: [row[i] for i in fields_pos]
+                        for row in rows}
+
+        nulls = [None for _ in fields_]
+        return [rows_map.get(id_, nulls) for id_ in ids]
+
+    def select_expr(self, fields_, ids, prefetched=None):
+        links = [lq for lq, _ in prefetched] if prefetched else ()
+        columns, positions = self.select_columns(fields_, links)
         expr = (
-            sqlalchemy.select([self.primary_key] + columns)
+            sqlalchemy.select(columns)
             .select_from(self.from_clause)
             .where(self.in_impl(self.primary_key, ids))
         )
-
-        def result_proc(rows):
-            rows_map = {row[self.primary_key]: [row[c] for c in columns]
-                        for row in rows}
-
-            nulls = [None for _ in fields_]
-            return [rows_map.get(id_, nulls) for id_ in ids]
-
+        result_proc = partial(self.process_rows, fields_, ids, positions,
+                              prefetched=prefetched)
         return expr, result_proc
 
     def __call__(self, ctx, fields_, ids):
         if not ids:
             return []
 
-        expr, result_proc = self.select_expr(fields_, ids)
-
+        prefetched = _get_prefetched(ctx, self.links)
+        result = []
         sa_engine = ctx[self.engine_key]
         with sa_engine.connect() as connection:
-            rows = connection.execute(expr).fetchall()
+            if self.fetch_size is not None:
+                connection = connection.execution_options(stream_results=True)
+            for chunk in self.chunks(ids):
+                expr, result_proc = self.select_expr(fields_, chunk,
+                                                     prefetched)
+                res = connection.execute(expr)
+                if self.fetch_size is not None:
+                    # rows are mapped while they are fetched
+                    rows = _fetch_many(res, self.fetch_size)
+                else:
+                    rows = res.fetchall()
+                result.extend(result_proc(rows))
+        return result
+
+
+class AsyncFieldsQuery(FieldsQuery):
+    """Base class of the fields queries for the asynchronous sources, see
+    :py:class:`FieldsQuery`
+
+    Subclasses are executing queries using the specific library.
+    """
+    async def _execute(self, engine, fields_, ids, prefetched):
+        """Returns rows with fields values for every identifier"""
+        raise NotImplementedError(type(self))
+
+    async def __call__(self, ctx, fields_, ids):
+        if not ids:
+            return []
 
-        return result_proc(rows)
+        prefetched = _get_prefetched(ctx, self.links)
+        engine = ctx[self.engine_key]
+        # chunks are fetched concurrently using separate connections
+        results = await asyncio.gather(*[
+            self._execute(engine, fields_, chunk, prefetched)
+            for chunk in self.chunks(ids)
+        ])
+        return [row for result in results for row in result]
 
 
 def _to_maybe_mapper(pairs, values):
@@ -102,7 +404,9 @@ def _to_many_mapper(pairs, values):
 
 class LinkQuery:
 
-    def __init__(self, engine_key, *, from_column, to_column):
+    def __init__(
+        self, engine_key, *, from_column, to_column, concurrency_limit=None
+    ):
         if from_column.table is not to_column.table:
             raise ValueError('from_column and to_column should belong to '
                              'one table')
@@ -110,6 +414,9 @@ class LinkQuery:
         self.engine_key = engine_key
         self.from_column = from_column
         self.to_column = to_column
+        self.concurrency_limit = concurrency_limit
+        # names of the links, defined using this query
+        self._link_names = set()
 
     def __repr__(self):
         return ('<{}.{}: engine_key={!r}, from_column={!r}, to_column={!r}>'
@@ -117,6 +424,7 @@ class LinkQuery:
                         self.engine_key, self.from_column, self.to_column))
 
     def __postprocess__(self, link):
+        self._link_names.add(link.name)
         if link.type_enum is One:
             func = partial(self, _to_one_mapper)
         elif link.type_enum is Maybe:
@@ -125,25 +433,71 @@ class LinkQuery:
             func = partial(self, _to_many_mapper)
         else:
             raise TypeError(repr(link.type_enum))
+        if self.concurrency_limit is not None:
+            limit_concurrency(self.concurrency_limit, key=self.engine_key)(func)
         link.func = pass_context(func)
 
     def in_impl(self, column, values):
         return column.in_(values)
 
-    def select_expr(self, ids):
+    def pairs_expr(self, ids, *, page=False, after=None, limit=None):
+        expr = (
+            sqlalchemy.select([self.from_column.label('from_column'),
+                               self.to_column.label('to_column')])
+            .where(self.in_impl(self.from_column, ids))
+        )
+        if not page:
+            return expr
+
+        # pagination options, see hiku.graph.Pagination
+        if after is not None:
+            expr = expr.where(self.to_column > after)
+        if limit is None:
+            return expr.order_by(self.to_column)
+
+        # selects first objects for every parent object
+        row_number = (
+            sqlalchemy.func.row_number()
+            .over(partition_by=self.from_column, order_by=self.to_column)
+        )
+        page = expr.column(row_number.label('row_number')).alias('page')
+        return (
+            sqlalchemy.select([page.c.from_column, page.c.to_column])
+            .where(page.c.row_number <= limit)
+            .order_by(page.c.to_column)
+        )
+
+    def select_expr(self, ids, options=None):
         # TODO: make this optional, but enabled by default
         filtered_ids = [i for i in set(ids) if i is not None]
-        if filtered_ids:
-            return (
-                sqlalchemy.select([self.from_column.label('from_column'),
-                                   self.to_column.label('to_column')])
-                .where(self.in_impl(self.from_column, filtered_ids))
-            )
-        else:
+        if not filtered_ids:
+            return None
+        if options is None:
+            return self.pairs_expr(filtered_ids)
+        return self.pairs_expr(filtered_ids, page=True,
+                               after=options.get('after'),
+                               limit=options.get('limit'))
+
+    def prefetched_pairs(self, ctx, ids):
+        """Returns pairs, fetched by the :py:class:`FieldsQuery` during
+        current query execution, or ``None`` if some of them are missing"""
+        if not isinstance(ctx, Context):
+            return None
+        pairs = ctx.state.get(self)
+        if pairs is None:
+            return None
+        ids = {i for i in ids if i is not None}
+        if not ids.issubset(pairs.keys()):
             return None
+        return [(i, pairs[i]) for i in ids]
 
-    def __call__(self, result_proc, ctx, ids):
-        expr = self.select_expr(ids)
+    def __call__(self, result_proc, ctx, ids, options=None):
+        if options is None:
+            pairs = self.prefetched_pairs(ctx, ids)
+            if pairs is not None:
+                return result_proc(pairs, ids)
+
+        expr = self.select_expr(ids, options)
         if expr is None:
             pairs = []
         else:
@@ -151,3 +505,28 @@ class LinkQuery:
             with sa_engine.connect() as connection:
                 pairs = connection.execute(expr).fetchall()
         return result_proc(pairs, ids)
+
+
+class AsyncLinkQuery(LinkQuery):
+    """Base class of the link queries for the asynchronous sources, see
+    :py:class:`LinkQuery`
+
+    Subclasses are executing queries using the specific library.
+    """
+    async def _execute(self, engine, ids, options):
+        """Returns pairs of the ``from_column`` and ``to_column`` values"""
+        raise NotImplementedError(type(self))
+
+    async def __call__(self, result_proc, ctx, ids, options=None):
+        if options is None:
+            pairs = self.prefetched_pairs(ctx, ids)
+            if pairs is not None:
+                return result_proc(pairs, ids)
+
+        filtered_ids = [i for i in set(ids) if i is not None]
+        if not filtered_ids:
+            return result_proc([], ids)
+
+        pairs = await self._execute(ctx[self.engine_key], filtered_ids,
+                                    options)
+        return result_proc(pairs, ids)
@@ -5,7 +5,7 @@ from functools import partial
 from prometheus_client import Summary
 
 from ..graph import GraphTransformer
-from ..engine import pass_context, _do_pass_context
+from ..engine import pass_context, _do_pass_context, _copy_attrs
 from ..sources.graph import CheckedExpr
 
 
@@ -78,9 +78,7 @@ class GraphMetricsBase(GraphTransformer):
         if _do_pass_context(func):
             wrapper = pass_context(wrapper)
         wrapper = _func_field_names(wrapper)
-        if _do_pass_context(func):
-            wrapper = pass_context(wrapper)
-        return wrapper
+        return _copy_attrs(wrapper, func)
 
     def _wrap_link(self, node_name, link_name, func):
         observe = self._observe_fields(node_name)
@@ -88,9 +86,7 @@ class GraphMetricsBase(GraphTransformer):
         if _do_pass_context(func):
             wrapper = pass_context(wrapper)
         wrapper = partial(wrapper, link_name)
-        if _do_pass_context(func):
-            wrapper = pass_context(wrapper)
-        return wrapper
+        return _copy_attrs(wrapper, func)
 
     def _wrap_subquery(self, node_name, subquery):
         observe = self._observe_fields(node_name)
@@ -0,0 +1,178 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hiku.graph import Graph, Root, Node, Field, Link, Option, apply
+from hiku.types import Sequence, TypeRef
+from hiku.engine import Engine, pass_context
+from hiku.builder import build, Q
+from hiku.batching import AsyncBatching
+from hiku.executors.asyncio import AsyncIOExecutor
+
+from .base import check_result
+
+
+@pytest.mark.asyncio
+async def test_batching(event_loop):
+    calls = []
+
+    async def root_fields(fields):
+        calls.append(('root_fields', [f.name for f in fields]))
+        return ['rhodes' for _ in fields]
+
+    @pass_context
+    async def user_fields(ctx, fields, ids):
+        calls.append(('user_fields', [f.name for f in fields], ids))
+        return [[i if f.name == 'id' else '{}-{}'.format(f.name, i)
+                 for f in fields] for i in ids]
+
+    async def friends(ids):
+        calls.append(('friends', ids))
+        return [[i + 1] for i in ids]
+
+    async def user(options):
+        calls.append(('user', options))
+        return options['ids']
+
+    graph = Graph([
+        Node('user', [
+            Field('id', None, user_fields),
+            Field('name', None, user_fields),
+            Link('friends', Sequence[TypeRef['user']], friends,
+                 requires='id'),
+        ]),
+        Root([
+            Field('title', None, root_fields),
+            Link('users', Sequence[TypeRef['user']], user, requires=None,
+                 options=[Option('ids', None)]),
+        ]),
+    ])
+    graph = apply(graph, [AsyncBatching()])
+    engine = Engine(AsyncIOExecutor(event_loop))
+
+    def query(ids):
+        return build([
+            Q.title,
+            Q.users(ids=ids)[
+                Q.name,
+                Q.friends[
+                    Q.name,
+                ],
+            ],
+        ])
+
+    result1, result2 = await asyncio.gather(
+        engine.execute(graph, query([1, 2]), {}),
+        engine.execute(graph, query([2, 3]), {}),
+    )
+    check_result(result1, {
+        'title': 'rhodes',
+        'users': [
+            {'name': 'name-1', 'friends': [{'name': 'name-2'}]},
+            {'name': 'name-2', 'friends': [{'name': 'name-3'}]},
+        ],
+    })
+    check_result(result2, {
+        'title': 'rhodes',
+        'users': [
+            {'name': 'name-2', 'friends': [{'name': 'name-3'}]},
+            {'name': 'name-3', 'friends': [{'name': 'name-4'}]},
+        ],
+    })
+    assert calls == [
+        ('root_fields', ['title']),
+        ('user', {'ids': [1, 2]}),
+        ('user', {'ids': [2, 3]}),
+        ('user_fields', ['name', 'id'], [1, 2, 3]),
+        ('friends', [1, 2, 3]),
+        ('user_fields', ['name'], [3, 4]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_error(event_loop):
+    async def root_fields(fields):
+        raise ValueError('inkling')
+
+    graph = apply(Graph([Root([Field('a', None, root_fields)])]),
+                  [AsyncBatching()])
+    engine = Engine(AsyncIOExecutor(event_loop))
+    results = await asyncio.gather(
+        engine.execute(graph, build([Q.a]), {}),
+        engine.execute(graph, build([Q.a]), {}),
+        return_exceptions=True,
+    )
+    assert [str(r) for r in results] == ['inkling', 'inkling']
+
+
+@pytest.mark.asyncio
+async def test_cancel(event_loop):
+    started = asyncio.Event()
+    tasks = []
+
+    async def root_fields(fields):
+        tasks.append(asyncio.current_task())
+        started.set()
+        await asyncio.sleep(60)
+
+    graph = apply(Graph([Root([Field('a', None, root_fields)])]),
+                  [AsyncBatching()])
+    engine = Engine(AsyncIOExecutor(event_loop))
+    results = asyncio.gather(
+        engine.execute(graph, build([Q.a]), {}),
+        engine.execute(graph, build([Q.a]), {}),
+        return_exceptions=True,
+    )
+    await started.wait()
+    tasks[0].cancel()
+    results = await asyncio.wait_for(results, 1)
+    assert [type(r) for r in results] == [asyncio.CancelledError,
+                                          asyncio.CancelledError]
+
+
+@pytest.mark.asyncio
+async def test_wrong_number_of_values(event_loop):
+    async def user_fields(fields, ids):
+        return [[i for _ in fields] for i in ids[:-1]]
+
+    async def users():
+        return [1, 2, 3]
+
+    graph = apply(Graph([
+        Node('user', [Field('id', None, user_fields)]),
+        Root([Link('users', Sequence[TypeRef['user']], users,
+                   requires=None)]),
+    ]), [AsyncBatching()])
+    engine = Engine(AsyncIOExecutor(event_loop))
+    results = await asyncio.wait_for(asyncio.gather(
+        engine.execute(graph, build([Q.users[Q.id]]), {}),
+        engine.execute(graph, build([Q.users[Q.id]]), {}),
+        return_exceptions=True,
+    ), 1)
+    assert [type(r) for r in results] == [TypeError, TypeError]
+    assert 'returned 2 values for 3 ids' in str(results[0])
+
+
+@pytest.mark.asyncio
+async def test_sync_functions(event_loop):
+    def user_fields(fields, ids):
+        return [[i for _ in fields] for i in ids]
+
+    def users():
+        return [1, 2]
+
+    graph = Graph([
+        Node('user', [Field('id', None, user_fields)]),
+        Root([Link('users', Sequence[TypeRef['user']], users,
+                   requires=None)]),
+    ])
+    batched = apply(graph, [AsyncBatching()])
+    assert batched.nodes_map['user'].fields_map['id'].func is user_fields
+    assert batched.root.fields_map['users'].func is users
+
+    with ThreadPoolExecutor(2) as pool:
+        engine = Engine(AsyncIOExecutor(event_loop, pool=pool))
+        result = await engine.execute(batched, build([Q.users[Q.id]]), {})
+    check_result(result, {'users': [{'id': 1}, {'id': 2}]})
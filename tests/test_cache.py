@@ -0,0 +1,174 @@
+from hiku.graph import Graph, Node, Field, Link, Root, Option, Nothing
+from hiku.types import String, Integer, Sequence, Optional, TypeRef
+from hiku.cache import CacheSettings, InMemoryCache, graph_namespace
+from hiku.engine import Engine, pass_context
+from hiku.builder import build, Q
+from hiku.executors.sync import SyncExecutor
+
+from .base import check_result, patch, Mock, call
+
+
+DATA = {
+    1: {'name': 'Cthulhu', 'age': 1000, 'friend': 2},
+    2: {'name': 'Dagon', 'age': 500, 'friend': Nothing},
+    3: {'name': 'Hydra', 'age': 300, 'friend': 1},
+}
+
+
+def _data_func(fields, ids):
+    def get(field, ident):
+        if field.name == 'id':
+            return ident
+        value = DATA[ident][field.name]
+        if field.options and field.options.get('upper'):
+            value = value.upper()
+        return value
+    return [[get(f, i) for f in fields] for i in ids]
+
+
+def get_graph(cache=CacheSettings(ttl=60)):
+    fields_func = Mock(side_effect=_data_func)
+    friend_func = Mock(side_effect=lambda ids: [DATA[i]['friend']
+                                                for i in ids])
+    root_fields_func = Mock(side_effect=lambda fields: ['Monsters'
+                                                        for _ in fields])
+    root_link_func = Mock(side_effect=lambda options: options['ids'])
+    graph = Graph([
+        Node('User', [
+            Field('id', Integer, fields_func),
+            Field('name', String, fields_func, cache=cache,
+                  options=[Option('upper', None, default=False)]),
+            Field('age', Integer, fields_func),
+            Link('friend', Optional[TypeRef['User']], friend_func,
+                 requires='id', cache=cache),
+        ]),
+        Root([
+            Field('title', String, root_fields_func, cache=cache),
+            Link('users', Sequence[TypeRef['User']], root_link_func,
+                 requires=None, options=[Option('ids', None)], cache=cache),
+        ]),
+    ])
+    return graph, fields_func, friend_func, root_fields_func, root_link_func
+
+
+def test_fields():
+    graph, fields_func, _, root_fields_func, _ = get_graph()
+    engine = Engine(SyncExecutor(), cache=InMemoryCache())
+
+    result = engine.execute(graph, build([Q.title, Q.users(ids=[1, 2])[
+        Q.name,
+    ]]))
+    check_result(result, {'title': 'Monsters', 'users': [{'name': 'Cthulhu'},
+                                                         {'name': 'Dagon'}]})
+    result = engine.execute(graph, build([Q.title, Q.users(ids=[2, 3])[
+        Q.name,
+        Q.name(upper=True),
+    ]]))
+    check_result(result, {'title': 'Monsters', 'users': [
+        {'name': 'DAGON'},
+        {'name': 'HYDRA'},
+    ]})
+    result = engine.execute(graph, build([Q.title, Q.users(ids=[3])[
+        Q.name,
+        Q.name(upper=True),
+    ]]))
+    check_result(result, {'title': 'Monsters', 'users': [{'name': 'HYDRA'}]})
+    assert root_fields_func.call_count == 1
+    assert [c[0][1] for c in fields_func.call_args_list] == [
+        [1, 2],
+        [2, 3],
+    ]
+
+
+def test_fields_partially_cached():
+    graph, fields_func, _, _, _ = get_graph()
+    engine = Engine(SyncExecutor(), cache=InMemoryCache())
+
+    engine.execute(graph, build([Q.users(ids=[1])[Q.name]]))
+    result = engine.execute(graph, build([Q.users(ids=[1, 2])[
+        Q.name,
+        Q.age,
+    ]]))
+    check_result(result, {'users': [{'name': 'Cthulhu', 'age': 1000},
+                                    {'name': 'Dagon', 'age': 500}]})
+    # names are loaded only for missing ids, other fields for all ids
+    calls = sorted(([f.name for f in c[0][0]], c[0][1])
+                   for c in fields_func.call_args_list)
+    assert calls == [
+        (['age'], [1, 2]),
+        (['name'], [1]),
+        (['name'], [2]),
+    ]
+
+
+def test_links():
+    graph, _, friend_func, _, root_link_func = get_graph()
+    engine = Engine(SyncExecutor(), cache=InMemoryCache())
+
+    query = build([Q.users(ids=[1, 2])[Q.friend[Q.id]]])
+    for _ in range(2):
+        result = engine.execute(graph, query)
+        check_result(result, {'users': [{'friend': {'id': 2}},
+                                        {'friend': None}]})
+    result = engine.execute(graph, build([Q.users(ids=[2, 3])[
+        Q.friend[Q.id],
+    ]]))
+    check_result(result, {'users': [{'friend': None}, {'friend': {'id': 1}}]})
+    assert friend_func.call_args_list == [call([1, 2]), call([3])]
+    assert root_link_func.call_args_list == [call({'ids': [1, 2]}),
+                                             call({'ids': [2, 3]})]
+
+
+def test_ttl():
+    graph, fields_func, _, _, _ = get_graph()
+    engine = Engine(SyncExecutor(), cache=InMemoryCache())
+
+    query = build([Q.users(ids=[1])[Q.name]])
+    with patch('hiku.cache.time.monotonic', return_value=100):
+        engine.execute(graph, query)
+    with patch('hiku.cache.time.monotonic', return_value=159):
+        engine.execute(graph, query)
+    with patch('hiku.cache.time.monotonic', return_value=160):
+        engine.execute(graph, query)
+    assert fields_func.call_count == 2
+
+
+def test_key():
+    @pass_context
+    def key(ctx, options):
+        return '{}:{}'.format(ctx['locale'], options.get('upper'))
+
+    graph, fields_func, _, _, _ = get_graph(CacheSettings(ttl=60, key=key))
+    cache = InMemoryCache()
+    engine = Engine(SyncExecutor(), cache=cache)
+
+    query = build([Q.users(ids=[1])[Q.name]])
+    engine.execute(graph, query, ctx={'locale': 'en'})
+    engine.execute(graph, query, ctx={'locale': 'en'})
+    engine.execute(graph, query, ctx={'locale': 'fr'})
+    assert fields_func.call_count == 2
+    assert (graph_namespace(graph), 'User', 1, 'name', 'fr:False') \
+        in cache._cache
+
+
+def test_graphs():
+    query_graph = Graph([
+        Root([
+            Field('title', String, lambda fields: ['Query' for _ in fields],
+                  cache=CacheSettings(ttl=60)),
+        ]),
+    ])
+    mutation_graph = Graph([
+        Root([
+            Field('title', String, lambda fields: ['Mutation' for _ in fields],
+                  cache=CacheSettings(ttl=60)),
+            Field('create', Integer, lambda fields: [1 for _ in fields]),
+        ]),
+    ])
+    assert graph_namespace(query_graph) != graph_namespace(mutation_graph)
+
+    engine = Engine(SyncExecutor(), cache=InMemoryCache())
+    query = build([Q.title])
+    check_result(engine.execute(query_graph, query), {'title': 'Query'})
+    check_result(engine.execute(mutation_graph, query), {'title': 'Mutation'})
+    check_result(engine.execute(query_graph, query), {'title': 'Query'})
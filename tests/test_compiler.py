@@ -11,7 +11,7 @@ from hiku.graph import Graph, Field, Node, Link, Root
 from hiku.compat import PY38
 from hiku.expr.core import define, S, if_, each, to_expr, if_some
 from hiku.expr.checker import check, fn_types
-from hiku.expr.compiler import ExpressionCompiler
+from hiku.expr.compiler import ExpressionCompiler, BatchExpressionCompiler
 
 
 @define(Any, _name='foo')
@@ -54,22 +54,18 @@ ENV = Graph([
 ])
 
 
-def check_compiles(dsl_expr, code):
+def _check(dsl_expr):
     types = ENV.__types__
 
     expr, functions = to_expr(dsl_expr)
     env = fn_types(functions)
     env.update(types['__root__'].__field_types__)
+    env['this'] = TypeRef['y']
 
-    expr = check(expr, types, env)
+    return check(expr, types, env)
 
-    # test eval
-    lambda_expr = ExpressionCompiler.compile_lambda_expr(expr)
-    eval(compile(lambda_expr, '<expr>', 'eval'))
-
-    # test compile
-    py_expr = ExpressionCompiler.compile_expr(expr)
 
+def assert_source(py_expr, code):
     first = astor.to_source(py_expr).strip()
     second = dedent(code).strip()
     if first != second:
@@ -79,6 +75,33 @@ def check_compiles(dsl_expr, code):
         raise AssertionError(msg)
 
 
+def check_compiles(dsl_expr, code):
+    expr = _check(dsl_expr)
+
+    # test eval
+    lambda_expr = ExpressionCompiler.compile_lambda_expr(expr)
+    eval(compile(lambda_expr, '<expr>', 'eval'))
+
+    # test compile
+    py_expr = ExpressionCompiler.compile_expr(expr)
+    assert_source(py_expr, code)
+
+
+def check_batch_compiles(dsl_expr, code):
+    expr = _check(dsl_expr)
+    nodes = set(ENV.nodes_map)
+
+    # test eval
+    batch_expr = BatchExpressionCompiler.compile_batch_expr(expr, nodes)
+    eval(compile(batch_expr, '<expr>', 'eval'))
+
+    # test compile
+    compiler = BatchExpressionCompiler(nodes)
+    with compiler.env.push(['this']):
+        py_expr = compiler.visit(expr)
+    assert_source(py_expr, code)
+
+
 def test_tuple():
     check_compiles(
         foo(S.a),
@@ -186,3 +209,27 @@ def test_generic_float():
         1.1,
         "(1.1)"
     )
+
+
+def test_batch_get_expr():
+    check_batch_compiles(
+        foo(S.this.x1.b),
+        """
+        env['foo'](idx['x'][idx['y'][this.ident]['x1'].ident]['b'])
+        """
+    )
+
+
+def test_batch_proxy():
+    check_batch_compiles(
+        baz(S.this.c, S.this),
+        """
+        env['baz'](idx['y'][this.ident]['c'], proxy(this))
+        """
+    )
+    check_batch_compiles(
+        each(S.i, S.ys, [S.i, S.i.c]),
+        """
+        [[proxy(i), idx['y'][i.ident]['c']] for i in ctx['ys']]
+        """
+    )
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from hiku.compat import PY36, PYPY
@@ -6,11 +8,12 @@ if not PY36 or PYPY:  # noqa
     pytest.skip("graphql-core-next library requires Python>=3.6",
                 allow_module_level=True)
 
-from hiku.types import TypeRef, Integer, Sequence
+from hiku.types import TypeRef, Integer, Sequence, Optional, Record, String
 from hiku.graph import Graph, Node, Field, Root, Link
 from hiku.result import ROOT, Proxy, Index, Reference
 from hiku.readers.graphql import read
 from hiku.denormalize.graphql import DenormalizeGraphQL
+from hiku.denormalize.graphql import DenormalizeGraphQLJSON
 
 
 def _(*args):
@@ -71,3 +74,57 @@ def test_typename():
             ],
         },
     }
+
+
+def test_json():
+    graph = Graph([
+        Node('Bar', [
+            Field('baz', Integer, _),
+            Field('qux', TypeRef['Qux'], _),
+        ]),
+        Node('Foo', [
+            Link('bar', Sequence[TypeRef['Bar']], _, requires=None),
+            Link('maybe', Optional[TypeRef['Bar']], _, requires=None),
+        ]),
+        Root([
+            Link('foo', TypeRef['Foo'], _, requires=None),
+            Field('text', String, _),
+        ]),
+    ], data_types={'Qux': Record[{'a': Integer, 'b': Integer}]})
+    query = read("""
+    query {
+        __typename
+        text
+        foo {
+            __typename
+            maybe { baz }
+            bar {
+                __typename
+                renamed: baz
+                qux { b }
+            }
+        }
+    }
+    """)
+    index = Index()
+    index[ROOT.node][ROOT.ident].update({
+        'foo': Reference('Foo', 1),
+        'text': 'ñañe "quoted"',
+    })
+    index['Foo'][1].update({
+        'bar': [Reference('Bar', i) for i in range(100)],
+        'maybe': None,
+    })
+    for i in range(100):
+        index['Bar'][i].update({
+            'baz': i,
+            'qux': {'a': i, 'b': -i},
+        })
+    result = Proxy(index, ROOT, query)
+
+    chunks = list(DenormalizeGraphQLJSON(graph, result, 'Query',
+                                         chunk_size=100).process(query))
+    assert len(chunks) > 10
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert json.loads(b''.join(chunks).decode('utf-8')) == \
+        DenormalizeGraphQL(graph, result, 'Query').process(query)
@@ -1,3 +1,5 @@
+from hashlib import sha256
+
 import pytest
 
 from hiku.compat import PY36, PYPY
@@ -6,6 +8,8 @@ if not PY36 or PYPY:  # noqa
     pytest.skip("graphql-core-next library requires Python>=3.6",
                 allow_module_level=True)
 
+from graphql.language.parser import parse
+
 from hiku.graph import Graph, Root, Field
 from hiku.types import String
 from hiku.engine import Engine
@@ -14,8 +18,11 @@ from hiku.readers.graphql import read
 from hiku.endpoint.graphql import _StripQuery, GraphQLEndpoint
 from hiku.endpoint.graphql import BatchGraphQLEndpoint, AsyncGraphQLEndpoint
 from hiku.endpoint.graphql import AsyncBatchGraphQLEndpoint
+from hiku.endpoint.graphql import InMemoryPersistedQueries
 from hiku.executors.asyncio import AsyncIOExecutor
 
+from .base import patch
+
 
 def test_strip():
     query = read("""
@@ -103,3 +110,71 @@ async def test_async_batch_endpoint(async_graph):
         {'data': {'answer': '42'}},
         {'data': {'__typename': 'Query'}},
     ]
+
+
+def test_cache(sync_graph):
+    endpoint = GraphQLEndpoint(Engine(SyncExecutor()), sync_graph,
+                               cache_size=2)
+    with patch('hiku.endpoint.graphql.parse', wraps=parse) as parse_mock:
+        for _ in range(3):
+            result = endpoint.dispatch({'query': '{answer}'})
+            assert result == {'data': {'answer': '42'}}
+        for _ in range(2):
+            result = endpoint.dispatch({'query': '{unknown}'})
+            assert result == {'errors': [
+                {'message': 'Field "unknown" is not implemented in the '
+                            '"root" node'},
+            ]}
+        for variables in [{'skip': True}, {'skip': False}]:
+            result = endpoint.dispatch({
+                'query': ('query Answer($skip: Boolean!) '
+                          '{ answer @skip(if: $skip) __typename }'),
+                'variables': variables,
+            })
+            if variables['skip']:
+                assert result == {'data': {'__typename': 'Query'}}
+            else:
+                assert result == {'data': {'answer': '42',
+                                           '__typename': 'Query'}}
+    assert parse_mock.call_count == 3
+
+
+def test_persisted_queries(sync_graph):
+    endpoint = GraphQLEndpoint(Engine(SyncExecutor()), sync_graph,
+                               cache_size=2,
+                               persisted_queries=InMemoryPersistedQueries())
+    query = '{answer}'
+    extensions = {'persistedQuery': {
+        'version': 1,
+        'sha256Hash': sha256(query.encode('utf-8')).hexdigest(),
+    }}
+
+    result = endpoint.dispatch({'extensions': extensions})
+    assert result == {'errors': [{'message': 'PersistedQueryNotFound'}]}
+
+    result = endpoint.dispatch({'query': query, 'extensions': extensions})
+    assert result == {'data': {'answer': '42'}}
+
+    result = endpoint.dispatch({'extensions': extensions})
+    assert result == {'data': {'answer': '42'}}
+
+    result = endpoint.dispatch({'query': '{__typename}',
+                                'extensions': extensions})
+    assert result == {'errors': [
+        {'message': 'Provided sha256Hash does not match query'},
+    ]}
+
+
+def test_persisted_queries_not_supported(sync_graph):
+    endpoint = GraphQLEndpoint(Engine(SyncExecutor()), sync_graph)
+    query = '{answer}'
+    extensions = {'persistedQuery': {
+        'version': 1,
+        'sha256Hash': sha256(query.encode('utf-8')).hexdigest(),
+    }}
+
+    result = endpoint.dispatch({'extensions': extensions})
+    assert result == {'errors': [{'message': 'PersistedQueryNotSupported'}]}
+
+    result = endpoint.dispatch({'query': query, 'extensions': extensions})
+    assert result == {'data': {'answer': '42'}}
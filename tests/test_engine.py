@@ -1,17 +1,24 @@
+import os
 import re
+import time
+
+from functools import partial
+from collections import abc
 
 import pytest
 
 from hiku import query as q
-from hiku.graph import Graph, Node, Field, Link, Option, Root
+from hiku.graph import Graph, Node, Field, Link, Option, Root, Nothing
+from hiku.graph import Pagination
 from hiku.types import Record, Sequence, Integer, Optional, TypeRef
 from hiku.utils import listify
-from hiku.engine import Engine, pass_context, Context
-from hiku.result import denormalize
+from hiku.engine import Engine, pass_context, Context, NodePlan
+from hiku.engine import store_fields, store_links, _LINK_REF_MAKER
+from hiku.result import denormalize, Index, ColumnarIndex
 from hiku.builder import build, Q
 from hiku.executors.sync import SyncExecutor
 
-from .base import check_result, ANY, Mock
+from .base import check_result, ANY, Mock, patch
 
 
 @listify
@@ -224,6 +231,85 @@ def test_link_option_missing():
               r'(.*) was not provided$')
 
 
+def test_link_pagination():
+    f1 = Mock(side_effect=lambda ids, options: [list(range(i, 6))
+                                                for i in ids])
+    f2 = Mock(return_value=[1, 2, 3])
+    f3 = Mock(side_effect=lambda fields, ids: [[i] * len(fields)
+                                               for i in ids])
+    graph = Graph([
+        Node('a', [
+            Field('id', None, f3),
+            Link('items', Sequence[TypeRef['a']], f1, requires='id',
+                 pagination=Pagination(2, max_limit=3)),
+        ]),
+        Root([
+            Link('list', Sequence[TypeRef['a']], f2, requires=None,
+                 pagination=Pagination(None)),
+        ]),
+    ])
+    result = execute(graph, build([
+        Q.list(after=1)[Q.id, Q.items[Q.id]],
+    ]))
+    check_result(result, {'list': [
+        {'id': 2, 'items': [{'id': 2}, {'id': 3}]},
+        {'id': 3, 'items': [{'id': 3}, {'id': 4}]},
+    ]})
+    f2.assert_called_once_with({'limit': None, 'after': 1})
+    f1.assert_called_once_with([2, 3], {'limit': 2, 'after': None})
+
+    f1.reset_mock()
+    execute(graph, build([Q.list[Q.items(limit=10)[Q.id]]]))
+    f1.assert_called_once_with([1, 2, 3], {'limit': 3, 'after': None})
+
+
+def test_link_pagination_unordered():
+    f1 = Mock(return_value=[5, 3, 1, 4, 2])
+    f2 = Mock(side_effect=lambda fields, ids: [[i] * len(fields)
+                                               for i in ids])
+    graph = Graph([
+        Node('a', [
+            Field('id', None, f2),
+        ]),
+        Root([
+            Link('list', Sequence[TypeRef['a']], f1, requires=None,
+                 pagination=Pagination(2)),
+        ]),
+    ])
+    check_result(execute(graph, build([Q.list[Q.id]])),
+                 {'list': [{'id': 1}, {'id': 2}]})
+    check_result(execute(graph, build([Q.list(after=2)[Q.id]])),
+                 {'list': [{'id': 3}, {'id': 4}]})
+    check_result(execute(graph, build([Q.list(after=4)[Q.id]])),
+                 {'list': [{'id': 5}]})
+
+
+def test_link_pagination_invalid_options():
+    graph = Graph([
+        Node('a', [
+            Field('id', None, Mock()),
+        ]),
+        Root([
+            Link('list', Sequence[TypeRef['a']], Mock(return_value=[1, 2]),
+                 requires=None, pagination=Pagination(2)),
+        ]),
+    ])
+    with pytest.raises(TypeError) as err:
+        execute(graph, build([Q.list(after='abc')[Q.id]]))
+    err.match('Invalid "after" option value: \'abc\'')
+
+    with pytest.raises(TypeError) as err:
+        execute(graph, build([Q.list(limit=-1)[Q.id]]))
+    err.match('Invalid "limit" option value: -1')
+
+
+def test_link_pagination_type():
+    with pytest.raises(TypeError) as err:
+        Link('b', TypeRef['a'], Mock(), requires=None,
+             pagination=Pagination(10))
+    err.match('Pagination is supported only for links with Sequence type')
+
+
 def test_pass_context_field():
     f = pass_context(Mock(return_value=['boiardo']))
 
@@ -672,3 +758,252 @@ def test_falsy_link_result():
     ]))
     assert denormalize(graph, result) == {'x': {'a': 42}}
     x_fields.assert_called_once_with([q.Field('a')], [0])
+
+
+def test_duplicate_ids():
+    f1 = Mock(return_value=[1, 2, 1, 3, 2])
+    f2 = Mock(side_effect=lambda ids: [i // 10 for i in ids])
+    f3 = Mock(side_effect=lambda fields, ids: [[i * 10] for i in ids])
+    f4 = Mock(side_effect=lambda fields, ids: [[i * 100] for i in ids])
+
+    graph = Graph([
+        Node('a', [
+            Field('id', None, f3),
+            Field('b', None, f4),
+            Link('c', TypeRef['a'], f2, requires='id'),
+        ]),
+        Root([
+            Link('d', Sequence[TypeRef['a']], f1, requires=None),
+        ]),
+    ])
+
+    result = execute(graph, build([Q.d[Q.b, Q.c[Q.b]]]))
+    check_result(result, {'d': [
+        {'b': 100, 'c': {'b': 100}},
+        {'b': 200, 'c': {'b': 200}},
+        {'b': 100, 'c': {'b': 100}},
+        {'b': 300, 'c': {'b': 300}},
+        {'b': 200, 'c': {'b': 200}},
+    ]})
+    f3.assert_called_once_with([q.Field('id')], [1, 2, 3])
+    f4.assert_called_once_with([q.Field('b')], [1, 2, 3])
+    f2.assert_called_once_with([10, 20, 30])
+
+
+def test_skip_loaded_ids():
+    f1 = Mock(return_value=[1, 2])
+    f2 = Mock(return_value=[2, 3])
+    f3 = Mock(side_effect=lambda fields, ids: [[i * 10] for i in ids])
+
+    graph = Graph([
+        Node('a', [
+            Field('b', None, f3),
+        ]),
+        Root([
+            Link('c', Sequence[TypeRef['a']], f1, requires=None),
+            Link('d', Sequence[TypeRef['a']], f2, requires=None),
+        ]),
+    ])
+
+    query = q.Node([q.Link('c', q.Node([q.Field('b')])),
+                    q.Link('d', q.Node([q.Field('b')]))], ordered=True)
+    result = execute(graph, query)
+    check_result(result, {'c': [{'b': 10}, {'b': 20}],
+                          'd': [{'b': 20}, {'b': 30}]})
+    assert f3.call_args_list == [
+        (([q.Field('b')], [1, 2]),),
+        (([q.Field('b')], [3]),),
+    ]
+
+
+def test_plan_cache():
+    f1 = Mock(side_effect=lambda options: options['ids'])
+    f2 = Mock(side_effect=lambda fields, ids: [[i * 10 for _ in fields]
+                                               for i in ids])
+    f3 = Mock(side_effect=lambda fields: [42 for _ in fields])
+
+    graph = Graph([
+        Node('a', [
+            Field('b', None, f2),
+            Field('c', None, f2),
+        ]),
+        Root([
+            Field('d', None, f3),
+            Link('e', Sequence[TypeRef['a']], f1, requires=None,
+                 options=[Option('ids', None)]),
+        ]),
+    ])
+
+    engine = Engine(SyncExecutor(), plan_cache_size=2)
+
+    def execute_compiled(query):
+        with patch.object(NodePlan, 'compile',
+                          side_effect=NodePlan.compile) as compile_:
+            result = engine.execute(graph, query)
+        return result, compile_.called
+
+    result, compiled = execute_compiled(
+        build([Q.d, Q.e(ids=[1, 2])[Q.b, Q.c]]),
+    )
+    assert compiled
+    check_result(result, {'d': 42, 'e': [{'b': 10, 'c': 10},
+                                         {'b': 20, 'c': 20}]})
+
+    # same shape, plan is reused
+    result, compiled = execute_compiled(
+        build([Q.d, Q.e(ids=[1, 2])[Q.b, Q.c]]),
+    )
+    assert not compiled
+    check_result(result, {'d': 42, 'e': [{'b': 10, 'c': 10},
+                                         {'b': 20, 'c': 20}]})
+
+    # different options
+    result, compiled = execute_compiled(
+        build([Q.d, Q.e(ids=[3])[Q.b, Q.c]]),
+    )
+    assert compiled
+    check_result(result, {'d': 42, 'e': [{'b': 30, 'c': 30}]})
+
+    # different aliases
+    result, compiled = execute_compiled(
+        build([Q.d, Q.e(ids=[3])[Q.b, Q.x << Q.c]]),
+    )
+    assert compiled
+    check_result(result, {'d': 42, 'e': [{'b': 30, 'x': 30}]})
+
+    assert len(engine._plan_cache) == 2
+
+
+def test_columnar_index():
+    f1 = Mock(return_value=[1, 2, 1])
+    f2 = Mock(side_effect=lambda fields, ids: [[i * 10 for _ in fields]
+                                               for i in ids])
+    f3 = Mock(side_effect=lambda ids: [[i + 1] for i in ids])
+
+    graph = Graph([
+        Node('a', [
+            Field('id', None, id_field),
+            Field('b', None, f2),
+            Link('c', Sequence[TypeRef['a']], f3, requires='id'),
+        ]),
+        Root([
+            Link('d', Sequence[TypeRef['a']], f1, requires=None),
+        ]),
+    ])
+
+    engine = Engine(SyncExecutor(), index_class=ColumnarIndex)
+    result = engine.execute(graph, build([Q.d[Q.b, Q.c[Q.id, Q.b]]]))
+    assert isinstance(result.__idx__, ColumnarIndex)
+    check_result(result, {'d': [
+        {'b': 10, 'c': [{'id': 2, 'b': 20}]},
+        {'b': 20, 'c': [{'id': 3, 'b': 30}]},
+        {'b': 10, 'c': [{'id': 2, 'b': 20}]},
+    ]})
+
+
+@pytest.mark.parametrize('index_class', [Index, ColumnarIndex])
+@pytest.mark.parametrize('deep_check', [True, False])
+def test_store_large_result(index_class, deep_check):
+    size = 10000
+    fields_func = Mock(side_effect=lambda fields, ids: [
+        (i * 2, str(i)) for i in ids
+    ])
+    graph = Graph([
+        Node('a', [
+            Field('id', None, id_field),
+            Field('b', None, fields_func),
+            Field('c', None, fields_func),
+            Link('d', Sequence[TypeRef['a']],
+                 Mock(side_effect=lambda ids: [[i] for i in ids]),
+                 requires='id'),
+            Link('e', Optional[TypeRef['a']],
+                 Mock(side_effect=lambda ids: [Nothing] * len(ids)),
+                 requires='id'),
+        ]),
+        Root([
+            Link('f', Sequence[TypeRef['a']],
+                 Mock(return_value=list(range(size))), requires=None),
+        ]),
+    ])
+    engine = Engine(SyncExecutor(), index_class=index_class,
+                    deep_check=deep_check)
+    result = engine.execute(graph, build([
+        Q.f[Q.b, Q.c, Q.d[Q.id], Q.e[Q.id]],
+    ]))
+    result = denormalize(graph, result)
+    assert len(result['f']) == size
+    assert result['f'][size - 1] == {'b': (size - 1) * 2, 'c': str(size - 1),
+                                     'd': [{'id': size - 1}], 'e': None}
+
+
+def _best_time(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@pytest.mark.skipif(not os.environ.get('HIKU_BENCHMARK'),
+                    reason='set HIKU_BENCHMARK=1 to run benchmarks')
+@pytest.mark.parametrize('index_class', [Index, ColumnarIndex])
+def test_store_large_result_benchmark(index_class):
+    size = 50000
+    ids = list(range(size))
+    rows = [[i, i * 2, str(i)] for i in ids]
+    links = [[i, i + 1] for i in ids]
+    graph = Graph([
+        Node('a', [
+            Field('b', None, Mock()),
+            Field('c', None, Mock()),
+            Field('d', None, Mock()),
+            Link('e', Sequence[TypeRef['a']], Mock(), requires='b'),
+        ]),
+        Root([]),
+    ])
+    node = graph.nodes_map['a']
+    graph_link = node.fields_map['e']
+    query_fields = [q.Field('b'), q.Field('c'), q.Field('d')]
+    query_link = q.Link('e', q.Node([]))
+
+    def store_fields_per_row():
+        # checking and storing of every row, as it was done before bulk
+        # storing was implemented
+        index = Index()
+        names = [f.index_key for f in query_fields]
+        assert all(isinstance(row, abc.Sequence) and len(row) == len(names)
+                   for row in rows)
+        node_idx = index['a']
+        for i, row in zip(ids, rows):
+            node_idx[i].update(zip(names, row))
+
+    def store_links_per_row():
+        index = Index()
+        assert all(isinstance(res, abc.Sequence) for res in links)
+        field_val = partial(_LINK_REF_MAKER[graph_link.type_enum],
+                            graph_link)
+        node_idx = index['a']
+        for i, res in zip(ids, links):
+            node_idx[i][query_link.index_key] = field_val(res)
+
+    def store_fields_bulk():
+        store_fields(index_class(), node, query_fields, ids, rows)
+
+    def store_links_bulk():
+        store_links(index_class(), node, graph_link, query_link, ids, links)
+
+    timings = {
+        'store_fields per row': _best_time(store_fields_per_row),
+        'store_fields bulk': _best_time(store_fields_bulk),
+        'store_links per row': _best_time(store_links_per_row),
+        'store_links bulk': _best_time(store_links_bulk),
+    }
+    print('\n{} rows, {}:'.format(size, index_class.__name__))
+    for name, value in timings.items():
+        print('  {}: {:.1f}ms'.format(name, value * 1000))
+    assert timings['store_fields bulk'] < timings['store_fields per row']
+    if index_class is ColumnarIndex:
+        # creation of the references takes most of the time, so links are
+        # stored noticeably faster only by the columnar index
+        assert timings['store_links bulk'] < timings['store_links per row']
@@ -1,7 +1,14 @@
 import asyncio
+import threading
+
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from hiku.graph import Graph, Root, Field
+from hiku.engine import Engine, limit_concurrency
+from hiku.builder import build, Q
 from hiku.executors.queue import Queue, Workflow
 from hiku.executors.asyncio import AsyncIOExecutor
 
@@ -78,3 +85,127 @@ async def test_cancellation(event_loop):
     assert task.done()
     assert task.cancelled() is True
     assert result == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_process(event_loop):
+    results = []
+
+    async def proc(value):
+        await asyncio.sleep(0)
+        return value
+
+    class TestWorkflow(Workflow):
+        def result(self):
+            return sorted(results)
+
+    executor = AsyncIOExecutor(event_loop)
+    queue = Queue(executor)
+    task_set = queue.fork(None)
+
+    def callback(task, level):
+        results.append(task.result())
+        if level < 2:
+            for i in range(3):
+                submit(task.result() * 10 + i, level + 1)
+
+    def submit(value, level):
+        task = queue.submit(task_set, proc, value)
+        queue.add_callback(task, lambda: callback(task, level))
+
+    submit(1, 0)
+    assert (await executor.process(queue, TestWorkflow())) == [
+        1, 10, 11, 12, 100, 101, 102, 110, 111, 112, 120, 121, 122,
+    ]
+    assert not queue.__futures__
+
+
+@pytest.mark.asyncio
+async def test_error(event_loop):
+    async def proc():
+        raise ValueError('weathers')
+
+    class TestWorkflow(Workflow):
+        def result(self):
+            raise AssertionError('impossible')
+
+    executor = AsyncIOExecutor(event_loop)
+    queue = Queue(executor)
+    task = queue.submit(queue.fork(None), proc)
+    queue.add_callback(task, task.result)
+
+    with pytest.raises(ValueError, match='weathers'):
+        await executor.process(queue, TestWorkflow())
+
+
+@pytest.mark.asyncio
+async def test_pool(event_loop):
+    def sync_func(value):
+        return value, threading.get_ident()
+
+    async def async_func(value):
+        return value, threading.get_ident()
+
+    class AsyncCallable:
+        async def __call__(self, value):
+            return value, threading.get_ident()
+
+    with ThreadPoolExecutor(2) as pool:
+        executor = AsyncIOExecutor(event_loop, pool=pool)
+        sync_value, sync_ident = await executor.submit(sync_func, 'bolts')
+        async_value, async_ident = await executor.submit(async_func, 'ions')
+        obj_value, obj_ident = await executor.submit(
+            partial(AsyncCallable(), 'pity'),
+        )
+
+    assert sync_value == 'bolts'
+    assert sync_ident != threading.get_ident()
+    assert async_value == 'ions'
+    assert async_ident == threading.get_ident()
+    assert obj_value == 'pity'
+    assert obj_ident == threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_pool_source_limit(event_loop):
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def sync_func(value):
+        with lock:
+            running.append(value)
+            max_running.append(len(running))
+        threading.Event().wait(0.01)
+        with lock:
+            running.remove(value)
+        return value
+
+    with ThreadPoolExecutor(4) as pool:
+        executor = AsyncIOExecutor(event_loop, pool=pool, source_limit=2)
+        results = await asyncio.gather(*[executor.submit(sync_func, i)
+                                         for i in range(6)])
+    assert results == list(range(6))
+    assert max(max_running) == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_concurrency_limit(event_loop):
+    running = []
+    max_running = []
+
+    @limit_concurrency(2, key='db')
+    async def fields(fields):
+        running.append(1)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        return ['pool' for _ in fields]
+
+    graph = Graph([Root([Field('a', None, fields)])])
+    engine = Engine(AsyncIOExecutor(event_loop))
+    results = await asyncio.gather(*[engine.execute(graph, build([Q.a]))
+                                     for _ in range(6)])
+    assert [r['a'] for r in results] == ['pool'] * 6
+    assert max(max_running) == 2
+    assert not engine._limits._running
@@ -0,0 +1,107 @@
+import os
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from hiku.graph import Graph, Root, Field
+from hiku.engine import Engine, pass_context
+from hiku.builder import build, Q
+from hiku.executors.processes import ProcessesExecutor, run_in_process
+
+from .base import check_result
+
+
+@run_in_process
+def remote_pid(fields):
+    return [os.getpid() for _ in fields]
+
+
+def local_pid(fields):
+    return [os.getpid() for _ in fields]
+
+
+@run_in_process
+@pass_context
+def remote_context_pid(ctx, fields):
+    assert isinstance(ctx['lock'], type(threading.Lock()))
+    return [os.getpid() for _ in fields]
+
+
+@run_in_process
+def remote_error(fields):
+    raise ValueError('transfix')
+
+
+class Counted:
+    pickled = 0
+
+    def __getstate__(self):
+        Counted.pickled += 1
+        return {}
+
+
+@pytest.fixture(name='engine')
+def _engine():
+    with ProcessPoolExecutor(2) as pool:
+        yield Engine(ProcessesExecutor(pool))
+
+
+def test_process(engine):
+    unpicklable = run_in_process(lambda fields: [os.getpid() for _ in fields])
+
+    graph = Graph([
+        Root([
+            Field('remote', None, remote_pid),
+            Field('local', None, local_pid),
+            Field('unpicklable', None, unpicklable),
+        ]),
+    ])
+    result = engine.execute(graph, build([Q.remote, Q.local, Q.unpicklable]))
+    assert result['remote'] != os.getpid()
+    check_result(result, {'local': os.getpid(),
+                          'unpicklable': os.getpid()})
+
+
+def test_unpicklable_arguments(engine):
+    graph = Graph([
+        Root([
+            Field('remote', None, remote_pid),
+        ]),
+    ])
+    result = engine.execute(graph, build([Q.remote(lock=threading.Lock())]))
+    check_result(result, {'remote': os.getpid()})
+
+
+def test_arguments_pickled_once(engine):
+    graph = Graph([
+        Root([
+            Field('remote', None, remote_pid),
+        ]),
+    ])
+    Counted.pickled = 0
+    result = engine.execute(graph, build([Q.remote(value=Counted())]))
+    assert result['remote'] != os.getpid()
+    assert Counted.pickled == 1
+
+
+def test_pass_context(engine):
+    graph = Graph([
+        Root([
+            Field('remote', None, remote_context_pid),
+        ]),
+    ])
+    result = engine.execute(graph, build([Q.remote]),
+                            {'lock': threading.Lock()})
+    check_result(result, {'remote': os.getpid()})
+
+
+def test_error(engine):
+    graph = Graph([
+        Root([
+            Field('error', None, remote_error),
+        ]),
+    ])
+    with pytest.raises(ValueError, match='transfix'):
+        engine.execute(graph, build([Q.error]))
@@ -1,8 +1,10 @@
 from functools import partial
+from concurrent.futures import Future
 
 import pytest
 
-from hiku.executors.queue import Queue
+from hiku.engine import limit_concurrency
+from hiku.executors.queue import Queue, DeferredFuture, ConcurrencyLimits
 
 
 class DummyFuture:
@@ -11,9 +13,18 @@ class DummyFuture:
         self.fn = fn
         self.args = args
         self.kwargs = kwargs
+        self._callbacks = []
 
     def run(self):
-        self.fn(*self.args, **self.kwargs)
+        self._result = self.fn(*self.args, **self.kwargs)
+        for callback in self._callbacks:
+            callback(self)
+
+    def result(self):
+        return self._result
+
+    def add_done_callback(self, callback):
+        self._callbacks.append(callback)
 
 
 class DummyExecutor:
@@ -21,6 +32,9 @@ class DummyExecutor:
     def submit(self, fn, *args, **kwargs):
         return DummyFuture(fn, args, kwargs)
 
+    def create_waiter(self):
+        return Future()
+
 
 def log_call(fn):
     def wrapper(results, *args, **kwargs):
@@ -172,4 +186,146 @@ def test(idx, queue):
     assert results == SCRIPT
     assert not queue._futures
     assert not queue._forks
+    assert not queue._pending
+    assert not queue._callbacks
+
+
+def test_empty_fork(queue):
+    results = []
+    task_set1 = queue.fork(None)
+    task = task_set1.submit(func, results, 'task')
+    task_set2 = queue.fork(task_set1)
+    queue.add_callback(task_set2, partial(results.append, 'task_set2'))
+    queue.add_callback(task_set1, partial(results.append, 'task_set1'))
+    task.run()
+    queue.progress([task])
+    assert results == ['.. task', 'task_set2', 'task_set1']
+    assert not queue._futures
+    assert not queue._forks
+    assert not queue._pending
     assert not queue._callbacks
+
+
+def test_many_futures(queue):
+    results = []
+    task_set = queue.fork(None)
+    tasks = [task_set.submit(func, results, i) for i in range(100)]
+    queue.add_callback(task_set, partial(results.append, 'done'))
+    for task in tasks[:50]:
+        task.run()
+    queue.progress(tasks[:50])
+    assert 'done' not in results
+    assert len(queue.__futures__) == 50
+    for task in tasks[50:]:
+        task.run()
+    queue.progress(reversed(tasks[50:]))
+    assert results[-1] == 'done'
+    assert not queue._futures
+    assert not queue._pending
+
+
+def run_limited(queue):
+    while queue.__futures__:
+        granted = [fut for fut in queue.__futures__
+                   if isinstance(fut, Future) and fut.done()]
+        if granted:
+            queue.progress(granted)
+            continue
+        task = next(fut for fut in queue.__futures__
+                    if isinstance(fut, DummyFuture))
+        task.run()
+        queue.progress([task])
+
+
+def test_concurrency_limit(queue):
+    results = []
+
+    @limit_concurrency(2, key='db')
+    def limited1(results, arg):
+        results.append(arg)
+        return arg
+
+    @limit_concurrency(2, key='db')
+    def limited2(results, arg):
+        results.append(arg)
+        return arg
+
+    task_set = queue.fork(None)
+    futures = [task_set.submit(limited1, results, 1),
+               task_set.submit(limited2, results, 2),
+               task_set.submit(limited1, results, 3),
+               task_set.submit(limited2, results, 4),
+               task_set.submit(func, results, 5)]
+    queue.add_callback(task_set, partial(results.append, 'done'))
+    for i, fut in enumerate(futures):
+        queue.add_callback(fut, partial(results.append, 'fut{}'.format(i)))
+    # 3 submitted futures and 2 waiters
+    assert len(queue.__futures__) == 5
+
+    run_limited(queue)
+
+    assert results == [
+        1, 'fut0', 2, 'fut1', '.. 5', 'fut4', 3, 'fut2', 4, 'fut3', 'done',
+    ]
+    assert isinstance(futures[2], DeferredFuture)
+    assert futures[2].result() == 3
+    assert futures[3].result() == 4
+    assert not queue._limits._running
+    assert not queue._limits._waiting
+    assert not queue._waiters
+    assert not queue._deferred
+    assert not queue._pending
+
+
+def test_shared_concurrency_limit():
+    results = []
+    limits = ConcurrencyLimits()
+    queue1 = Queue(DummyExecutor(), limits)
+    queue2 = Queue(DummyExecutor(), limits)
+
+    @limit_concurrency(1, key='db')
+    def limited(results, arg):
+        results.append(arg)
+        return arg
+
+    fut1 = queue1.fork(None).submit(limited, results, 1)
+    fut2 = queue2.fork(None).submit(limited, results, 2)
+    assert isinstance(fut2, DeferredFuture)
+    waiter, = queue2.__futures__
+    assert not waiter.done()
+
+    # slot is passed to another queue, when future is completed
+    fut1.run()
+    assert waiter.done()
+    queue1.progress([fut1])
+    run_limited(queue2)
+    assert results == [1, 2]
+    assert fut2.result() == 2
+    assert not limits._running
+    assert not limits._waiting
+
+
+def test_discard_waiters():
+    results = []
+    limits = ConcurrencyLimits()
+    queue1 = Queue(DummyExecutor(), limits)
+    queue2 = Queue(DummyExecutor(), limits)
+    queue3 = Queue(DummyExecutor(), limits)
+
+    @limit_concurrency(1, key='db')
+    def limited(results, arg):
+        results.append(arg)
+        return arg
+
+    fut1 = queue1.fork(None).submit(limited, results, 1)
+    queue2.fork(None).submit(limited, results, 2)
+    queue3.fork(None).submit(limited, results, 3)
+
+    # slot is passed to the waiter of the failed query and then released
+    fut1.run()
+    queue2.discard_waiters()
+    queue1.progress([fut1])
+    run_limited(queue3)
+    assert results == [1, 3]
+    assert not limits._running
+    assert not limits._waiting
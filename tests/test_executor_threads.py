@@ -0,0 +1,97 @@
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hiku.graph import Graph, Root, Field
+from hiku.engine import Engine, limit_concurrency
+from hiku.builder import build, Q
+from hiku.executors.queue import Queue, Workflow
+from hiku.executors.threads import ThreadsExecutor
+
+
+@pytest.fixture(name='executor')
+def _executor():
+    with ThreadPoolExecutor(4) as pool:
+        yield ThreadsExecutor(pool)
+
+
+def test_process(executor):
+    results = []
+
+    def proc(value):
+        time.sleep(0.001)
+        return value
+
+    class TestWorkflow(Workflow):
+        def result(self):
+            return sorted(results)
+
+    queue = Queue(executor)
+    task_set = queue.fork(None)
+
+    def callback(fut, level):
+        results.append(fut.result())
+        if level < 2:
+            for i in range(3):
+                submit(fut.result() * 10 + i, level + 1)
+
+    def submit(value, level):
+        fut = queue.submit(task_set, proc, value)
+        queue.add_callback(fut, lambda: callback(fut, level))
+
+    submit(1, 0)
+    assert executor.process(queue, TestWorkflow()) == [
+        1, 10, 11, 12, 100, 101, 102, 110, 111, 112, 120, 121, 122,
+    ]
+    assert not queue.__futures__
+
+
+def test_error(executor):
+    def proc():
+        raise ValueError('sleights')
+
+    class TestWorkflow(Workflow):
+        def result(self):
+            raise AssertionError('impossible')
+
+    queue = Queue(executor)
+    fut = queue.submit(queue.fork(None), proc)
+    queue.add_callback(fut, fut.result)
+
+    with pytest.raises(ValueError, match='sleights'):
+        executor.process(queue, TestWorkflow())
+
+
+def test_shared_concurrency_limit(executor):
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    @limit_concurrency(1, key='db')
+    def fields(fields):
+        with lock:
+            running.append(1)
+            max_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+        return ['pool' for _ in fields]
+
+    graph = Graph([Root([Field('a', None, fields)])])
+    engine = Engine(executor)
+    results = []
+
+    def execute():
+        results.append(engine.execute(graph, build([Q.a]))['a'])
+
+    threads = [threading.Thread(target=execute) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['pool'] * 4
+    assert max(max_running) == 1
+    assert not engine._limits._running
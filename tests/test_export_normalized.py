@@ -0,0 +1,90 @@
+import json
+
+from hiku.types import Record, String, Integer, Optional, Sequence, TypeRef
+from hiku.graph import Graph, Node, Field, Link, Root, Nothing
+from hiku.engine import Engine
+from hiku.result import denormalize
+from hiku.readers.simple import read
+from hiku.executors.sync import SyncExecutor
+from hiku.export.normalized import export_json, export_protobuf
+from hiku.readers.normalized import read_json, read_protobuf
+
+
+USERS = {
+    1: {'name': 'Cthulhu', 'friends': [2, 3], 'best': 2},
+    2: {'name': 'Dagon', 'friends': [1, 3], 'best': Nothing},
+    3: {'name': 'Hydra', 'friends': [1, 2], 'best': 1},
+}
+
+
+def user_fields(fields, ids):
+    def get(field, ident):
+        if field.name == 'id':
+            return ident
+        elif field.name == 'info':
+            return {'stories': len(USERS[ident]['name'])}
+        else:
+            return USERS[ident][field.name]
+    return [[get(f, i) for f in fields] for i in ids]
+
+
+GRAPH = Graph([
+    Node('User', [
+        Field('name', String, user_fields),
+        Field('info', Record[{'stories': Integer}], user_fields),
+        Link('friends', Sequence[TypeRef['User']],
+             lambda ids: [USERS[i]['friends'] for i in ids],
+             requires='id'),
+        Link('best', Optional[TypeRef['User']],
+             lambda ids: [USERS[i]['best'] for i in ids],
+             requires='id'),
+        Field('id', Integer, user_fields),
+    ]),
+    Root([
+        Field('title', String, lambda fields: ['Monsters']),
+        Link('users', Sequence[TypeRef['User']], lambda: [1, 2, 3],
+             requires=None),
+        Link('nobody', Sequence[TypeRef['User']], lambda: [],
+             requires=None),
+    ]),
+])
+
+QUERY = read("""
+[:title
+ {:nobody [:name]}
+ {:users [:name {:info [:stories]}
+          {:friends [:name {:best [:name]}]}
+          {:best [:name]}]}]
+""")
+
+
+def execute():
+    return Engine(SyncExecutor()).execute(GRAPH, QUERY)
+
+
+def test_json():
+    result = execute()
+    data = json.loads(json.dumps(export_json(result)))
+    assert data['User'][0] == [1, {'id': 1, 'name': 'Cthulhu',
+                                   'info': {'stories': 7}},
+                               {'friends': [['User', 2], ['User', 3]],
+                                'best': ['User', 2]}]
+    assert len(data['User']) == 3
+
+    proxy = read_json(data, QUERY)
+    assert denormalize(GRAPH, proxy) == denormalize(GRAPH, result)
+    assert len(json.dumps(data)) < len(json.dumps(denormalize(GRAPH, result)))
+
+
+def test_protobuf():
+    result = execute()
+    data = export_protobuf(result).SerializeToString()
+    proxy = read_protobuf(data, QUERY)
+    assert proxy['users'][1]['name'] == 'Dagon'
+    assert proxy['users'][1]['best'] is None
+    assert proxy['users'][2]['best']['name'] == 'Cthulhu'
+    assert proxy['nobody'] == []
+    expected = denormalize(GRAPH, result)
+    for user in expected['users']:
+        user['info']['stories'] = float(user['info']['stories'])
+    assert denormalize(GRAPH, proxy) == expected
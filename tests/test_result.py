@@ -7,6 +7,7 @@ from hiku.query import merge
 from hiku.types import Record, String, Optional, Sequence, TypeRef, Integer
 from hiku.graph import Graph, Link, Node, Field, Root
 from hiku.result import denormalize, Index, Proxy, Reference, ROOT
+from hiku.result import ColumnarIndex, CompiledProxy
 from hiku.readers.simple import read
 
 
@@ -446,3 +447,66 @@ def test_denormalize_data_type():
         ])),
     ])
     assert denormalize(graph, Proxy(index, ROOT, query)) == {'foo': {'a': 42}}
+
+
+def test_columnar_index():
+    index = ColumnarIndex()
+    node = index['SomeNode']
+    node.store([1, 2, 2], ['a', 'b'], [[10, 11], [20, 21], [20, 21]])
+    node.store_column([3, 1], 'c', [Reference('SomeNode', 1), None])
+    node.store([3], ['a'], [[30]])
+    index.root['d'] = [Reference('SomeNode', 3)]
+    index.finish()
+
+    assert list(node) == [1, 2, 3]
+    assert dict(node[1]) == {'a': 10, 'b': 11, 'c': None}
+    assert dict(node[2]) == {'a': 20, 'b': 21}
+    assert 'c' not in node[2]
+    with pytest.raises(KeyError):
+        node[2]['c']
+    with pytest.raises(KeyError):
+        node[4]
+    with pytest.raises(KeyError):
+        index['UnknownNode']
+
+    query = hiku_query.Node([
+        hiku_query.Link('d', hiku_query.Node([
+            hiku_query.Field('a'),
+            hiku_query.Link('c', hiku_query.Node([hiku_query.Field('b')])),
+        ])),
+    ])
+    proxy = Proxy(index, ROOT, query)
+    assert proxy.d[0].a == 30
+    assert proxy.d[0].c.b == 11
+
+
+@pytest.mark.parametrize('graph', [GRAPH, None])
+def test_compiled_proxy(graph):
+    query = merge([read("""
+    [:slotted {:rlyeh [{:priest [:name]}]}
+     {:flossy [{:daur [:doghead]} {:carf [:nerv]} {:anoxic [:peeps]}]}
+     {:zareeba [{:mistic [{:paramo [:nerv]}]} {:biopics [:panton]}]}
+     {:crowdie [:nerv {:biopics [{:bahut [:nerv]}]}]}]
+    """)])
+    proxy = CompiledProxy(INDEX, ROOT, query, graph=graph)
+    assert denormalize(GRAPH, proxy) == denormalize(GRAPH, get_result(query))
+    assert proxy.flossy.carf is None
+    assert proxy.crowdie[1].biopics[0].bahut.nerv == 'deist_vined'
+
+    with pytest.raises(KeyError) as err:
+        proxy['unknown']
+    err.match(r"Field 'unknown' wasn't requested in the query")
+
+
+def test_compiled_proxy_missing_field():
+    index = Index()
+    index['SomeNode'][42].update({})
+    index.finish()
+
+    ref = Reference('SomeNode', 42)
+    node = hiku_query.Node([hiku_query.Field('foo')])
+    proxy = CompiledProxy(index, ref, node)
+
+    with pytest.raises(AssertionError) as err:
+        proxy.foo
+    err.match(r"Field SomeNode\[42\]\.foo is missing in the index")
@@ -1,3 +1,7 @@
+import os
+import sys
+import subprocess
+
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 
@@ -9,11 +13,12 @@ from hiku.engine import Engine
 from hiku.builder import build, Q
 from hiku.expr.core import define, S, each
 from hiku.sources.graph import SubGraph
+from hiku.expr.cache import ExprCache
 from hiku.readers.simple import read
 from hiku.executors.sync import SyncExecutor
 from hiku.executors.threads import ThreadsExecutor
 
-from .base import check_result
+from .base import check_result, patch
 
 
 DATA = {
@@ -115,6 +120,11 @@ def buz(x, size):
     return '{x[a]} - {size}'.format(x=x, size=size)
 
 
+@define(Any, Any)
+def add(a, b):
+    return a + b
+
+
 sg_x = SubGraph(_GRAPH, 'x')
 
 sg_y = SubGraph(_GRAPH, 'y')
@@ -260,3 +270,131 @@ def test_complex_field():
     ])
     result = engine.execute(hl_graph, build([Q.foo[Q.a[Q.s]]]))
     check_result(result, {'foo': {'a': {'s': 'bar'}}})
+
+
+@pytest.mark.parametrize('executor', [
+    SyncExecutor(),
+    ThreadsExecutor(ThreadPoolExecutor(2)),
+])
+def test_memoize(executor):
+    loaded = []
+
+    def get_a(fields, ids):
+        loaded.extend((f.name, i) for f in fields for i in ids)
+        return [[i * 10 for _ in fields] for i in ids]
+
+    ll_graph = Graph([
+        Node('Foo', [
+            Field('a', None, get_a),
+            Field('b', None, get_a),
+        ]),
+    ])
+    foo_sg = SubGraph(ll_graph, 'Foo')
+    hl_graph = Graph([
+        Node('Foo1', [
+            Field('a', None, foo_sg),
+        ]),
+        Node('Foo2', [
+            Field('a', None, foo_sg),
+            Field('ab', None, foo_sg.c(add(S.this.a, S.this.b))),
+        ]),
+        Root([
+            Link('foo1', Sequence[TypeRef['Foo1']], lambda: [1, 2],
+                 requires=None),
+            Link('foo2', Sequence[TypeRef['Foo2']], lambda: [2, 3],
+                 requires=None),
+        ]),
+    ])
+    engine = Engine(executor)
+    result = engine.execute(hl_graph, build([
+        Q.foo1[Q.a],
+        Q.foo2[Q.a, Q.ab],
+    ]))
+    check_result(result, {
+        'foo1': [{'a': 10}, {'a': 20}],
+        'foo2': [{'a': 20, 'ab': 40}, {'a': 30, 'ab': 60}],
+    })
+    assert sorted(loaded) == [('a', 1), ('a', 2), ('a', 3),
+                              ('b', 2), ('b', 3)]
+
+    # memo is request-scoped
+    del loaded[:]
+    engine.execute(hl_graph, build([Q.foo1[Q.a]]))
+    assert sorted(loaded) == [('a', 1), ('a', 2)]
+
+
+def _expr_cache_graph(path):
+    sg = SubGraph(_GRAPH, 'x', expr_cache=ExprCache(path))
+    return Graph([
+        Node('x1', [
+            Field('bar', None, sg.c(bar(S.this))),
+            Field('buz', None, sg.c(buz(S.this, S.size)),
+                  options=[Option('size', None, default=None)]),
+        ]),
+        Root([
+            Link('x1s', Sequence[TypeRef['x1']], to_x, requires=None),
+        ]),
+    ])
+
+
+_EXPR_CACHE_QUERY = '[{:x1s [:bar (:buz {:size 5})]}]'
+
+_EXPR_CACHE_RESULT = {'x1s': [
+    {'bar': 'B1 D3', 'buz': 'a1 - 5'},
+    {'bar': 'B3 D1', 'buz': 'a3 - 5'},
+    {'bar': 'B2 D2', 'buz': 'a2 - 5'},
+]}
+
+
+def test_expr_cache(tmp_path):
+    query = read(_EXPR_CACHE_QUERY)
+    engine = Engine(SyncExecutor())
+    result1 = engine.execute(_expr_cache_graph(str(tmp_path)), query)
+    assert len(list(tmp_path.iterdir())) == 2
+
+    with patch('hiku.sources.graph.check') as check_mock:
+        graph = _expr_cache_graph(str(tmp_path))
+    assert not check_mock.called
+    result2 = engine.execute(graph, query)
+    check_result(result1, _EXPR_CACHE_RESULT)
+    check_result(result2, _EXPR_CACHE_RESULT)
+
+
+def test_expr_cache_other_process(tmp_path):
+    subprocess.check_call([
+        sys.executable, '-c',
+        'import sys; from tests.test_source_graph import _expr_cache_graph; '
+        '_expr_cache_graph(sys.argv[1])',
+        str(tmp_path),
+    ], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert len(list(tmp_path.iterdir())) == 2
+
+    with patch('hiku.sources.graph.check') as check_mock:
+        graph = _expr_cache_graph(str(tmp_path))
+    assert not check_mock.called
+    assert len(list(tmp_path.iterdir())) == 2
+    result = Engine(SyncExecutor()).execute(graph, read(_EXPR_CACHE_QUERY))
+    check_result(result, _EXPR_CACHE_RESULT)
+
+
+def test_expr_cache_same_qualname(tmp_path):
+    def get_func(value):
+        @define(Any)
+        def func(x):
+            return value
+        return func
+
+    func1, func2 = get_func(1), get_func(2)
+    assert func1.__def_qualname__ == func2.__def_qualname__
+
+    sg = SubGraph(_GRAPH, 'x', expr_cache=ExprCache(str(tmp_path)))
+    graph = Graph([
+        Node('x1', [
+            Field('pair', None, sg.c([func1(S.this), func2(S.this)])),
+        ]),
+        Root([
+            Link('x1s', Sequence[TypeRef['x1']], to_x, requires=None),
+        ]),
+    ])
+    result = Engine(SyncExecutor()).execute(graph, read('[{:x1s [:pair]}]'))
+    check_result(result, {'x1s': [{'pair': [1, 2]}] * 3})
@@ -1,3 +1,5 @@
+import threading
+
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
 
@@ -11,14 +13,14 @@ from sqlalchemy.schema import MetaData, Table, Column, ForeignKey
 import hiku.sources.sqlalchemy
 
 from hiku.types import IntegerMeta, StringMeta, TypeRef, Sequence, Optional
-from hiku.graph import Graph, Node, Field, Link, Root
+from hiku.graph import Graph, Node, Field, Link, Root, Pagination
 from hiku.utils import cached_property
 from hiku.engine import Engine
 from hiku.readers.simple import read
 from hiku.executors.threads import ThreadsExecutor
-from hiku.sources.sqlalchemy import LinkQuery
+from hiku.sources.sqlalchemy import LinkQuery, RequestConnections
 
-from .base import check_result
+from .base import check_result, patch, Mock
 
 
 SA_ENGINE_KEY = 'sa-engine'
@@ -107,13 +109,40 @@ class SyncQueries(AbstractQueries):
         return 0
 
 
-def get_queries(source_module, ctx_var, base_cls):
+class AsyncQueries(AbstractQueries):
+
+    async def foo_list(self):
+        return SyncQueries.foo_list.__call__(self)
+
+    async def bar_list(self):
+        return SyncQueries.bar_list.__call__(self)
+
+    async def not_found_one(self):
+        return SyncQueries.not_found_one.__call__(self)
+
+    async def not_found_list(self):
+        return SyncQueries.not_found_list.__call__(self)
+
+    async def falsy_one(self):
+        return SyncQueries.falsy_one.__call__(self)
+
+
+def get_queries(source_module, ctx_var, base_cls, **fields_query_kwargs):
     _sm = source_module
 
     class Queries(base_cls):
-        foo_query = _sm.FieldsQuery(ctx_var, foo_table)
+        foo_to_bar_query = _sm.LinkQuery(
+            ctx_var,
+            from_column=foo_table.c.id,
+            to_column=foo_table.c.bar_id,
+        )
+
+        foo_query = _sm.FieldsQuery(ctx_var, foo_table,
+                                    links=[foo_to_bar_query],
+                                    **fields_query_kwargs)
 
-        bar_query = _sm.FieldsQuery(ctx_var, bar_table)
+        bar_query = _sm.FieldsQuery(ctx_var, bar_table,
+                                    **fields_query_kwargs)
 
         to_foo_query = _sm.LinkQuery(
             ctx_var,
@@ -141,6 +170,8 @@ def get_graph(queries):
             Field('bar_id', None, _q.foo_query),
             Link('bar', Optional[TypeRef['bar']], _q.to_bar_query,
                  requires='bar_id'),
+            Link('bar_joined', Optional[TypeRef['bar']], _q.foo_to_bar_query,
+                 requires='id'),
         ]),
         Node(bar_table.name, [
             Field('id', None, _q.bar_query),
@@ -148,6 +179,8 @@ def get_graph(queries):
             Field('type', None, _q.bar_query),
             Link('foo_s', Sequence[TypeRef['foo']], _q.to_foo_query,
                  requires='id'),
+            Link('foo_page', Sequence[TypeRef['foo']], _q.to_foo_query,
+                 requires='id', pagination=Pagination(1, max_limit=2)),
         ]),
         Root([
             Link('foo_list', Sequence[TypeRef['foo']],
@@ -217,6 +250,14 @@ class SourceSQLAlchemyTestBase(ABC):
                       to_column=bar_table.c.id)
         e.match('should belong')
 
+    def test_links_primary_key(self):
+        link_query = LinkQuery(SA_ENGINE_KEY, from_column=foo_table.c.bar_id,
+                               to_column=foo_table.c.id)
+        with pytest.raises(ValueError) as e:
+            hiku.sources.sqlalchemy.FieldsQuery(SA_ENGINE_KEY, foo_table,
+                                                links=[link_query])
+        e.match('should be the primary key')
+
     def test_many_to_one(self):
         self.check(
             '[{:foo_list [:name :count :bar_id {:bar [:name :type]}]}]',
@@ -248,6 +289,36 @@ class SourceSQLAlchemyTestBase(ABC):
             ]},
         )
 
+    def test_pagination(self):
+        self.check(
+            '[{:bar_list [:id {:foo_page [:name]}]}]',
+            {'bar_list': [
+                {'id': 6, 'foo_page': [{'name': 'foo4'}]},
+                {'id': 5, 'foo_page': [{'name': 'foo2'}]},
+                {'id': 4, 'foo_page': [{'name': 'foo3'}]},
+            ]},
+        )
+        self.check(
+            '[{:bar_list [:id {(:foo_page {:limit 5 :after 2}) [:name]}]}]',
+            {'bar_list': [
+                {'id': 6, 'foo_page': [{'name': 'foo4'}]},
+                {'id': 5, 'foo_page': [{'name': 'foo5'}]},
+                {'id': 4, 'foo_page': [{'name': 'foo3'}, {'name': 'foo6'}]},
+            ]},
+        )
+
+    def test_joined_link(self):
+        self.check(
+            '[{:bar_list [:id {:foo_s [:name {:bar_joined [:id]}]}]}]',
+            {'bar_list': [
+                {'id': 6, 'foo_s': [{'name': 'foo4', 'bar_joined': {'id': 6}}]},
+                {'id': 5, 'foo_s': [{'name': 'foo2', 'bar_joined': {'id': 5}},
+                                    {'name': 'foo5', 'bar_joined': {'id': 5}}]},
+                {'id': 4, 'foo_s': [{'name': 'foo3', 'bar_joined': {'id': 4}},
+                                    {'name': 'foo6', 'bar_joined': {'id': 4}}]},
+            ]},
+        )
+
     def test_not_found(self):
         self.check(
             '[{:not_found_one [:name :type]}'
@@ -283,15 +354,112 @@ class TestSourceSQLAlchemy(SourceSQLAlchemyTestBase):
     def queries(self):
         return get_queries(hiku.sources.sqlalchemy, SA_ENGINE_KEY, SyncQueries)
 
-    def check(self, src, value):
+    def get_engine(self):
         sa_engine = create_engine(
             'sqlite://',
             connect_args={'check_same_thread': False},
             poolclass=StaticPool,
         )
         setup_db(sa_engine)
+        return sa_engine
 
+    def check(self, src, value):
         engine = Engine(ThreadsExecutor(thread_pool))
         result = engine.execute(self.graph, read(src),
-                                {SA_ENGINE_KEY: sa_engine})
+                                {SA_ENGINE_KEY: self.get_engine()})
+        check_result(result, value)
+
+    def test_joined_link_query(self):
+        link_query = self.queries.foo_to_bar_query
+        with patch.object(link_query, 'select_expr',
+                          wraps=link_query.select_expr) as select_expr:
+            self.test_joined_link()
+        assert not select_expr.called
+
+    def test_joined_link_not_requested(self):
+        foo_query = self.queries.foo_query
+        with patch.object(foo_query, 'select_columns',
+                          wraps=foo_query.select_columns) as select_columns:
+            self.check(
+                '[{:bar_list [:id {:foo_s [:name]}]}]',
+                {'bar_list': [
+                    {'id': 6, 'foo_s': [{'name': 'foo4'}]},
+                    {'id': 5, 'foo_s': [{'name': 'foo2'}, {'name': 'foo5'}]},
+                    {'id': 4, 'foo_s': [{'name': 'foo3'}, {'name': 'foo6'}]},
+                ]},
+            )
+        assert select_columns.called
+        for _, links in (c[0] for c in select_columns.call_args_list):
+            assert not links
+
+    def test_joined_link_dict_ctx(self):
+        ctx = {SA_ENGINE_KEY: self.get_engine()}
+        fields = read('[:name :bar_id]').fields
+        assert self.queries.foo_query(ctx, fields, [2, 3]) == \
+            [['foo2', 5], ['foo3', 4]]
+        link = self.graph.nodes_map[foo_table.name].fields_map['bar_joined']
+        assert link.func(ctx, [2, 3]) == [5, 4]
+
+
+class TestSourceSQLAlchemyChunks(TestSourceSQLAlchemy):
+
+    @cached_property
+    def queries(self):
+        return get_queries(hiku.sources.sqlalchemy, SA_ENGINE_KEY, SyncQueries,
+                           chunk_size=2, fetch_size=1)
+
+    def test_chunks(self):
+        assert self.queries.foo_query.chunks([1, 2, 3, 4, 5]) == \
+            [[1, 2], [3, 4], [5]]
+        assert self.queries.foo_query.chunks([1, 2]) == [[1, 2]]
+
+
+class TestSourceSQLAlchemyConnections(TestSourceSQLAlchemy):
+
+    def check(self, src, value):
+        sa_engine = self.get_engine()
+        engine = Engine(ThreadsExecutor(thread_pool))
+        with patch.object(sa_engine, 'connect',
+                          wraps=sa_engine.connect) as connect:
+            with RequestConnections(sa_engine, max_size=1,
+                                    isolation_level='SERIALIZABLE') as conns:
+                result = engine.execute(self.graph, read(src),
+                                        {SA_ENGINE_KEY: conns})
         check_result(result, value)
+        connect.assert_called_once_with()
+
+
+def test_request_connections_open():
+    opening = threading.Event()
+    opened = threading.Event()
+    reused = []
+    timed_out = []
+
+    def connect():
+        if sa_engine.connect.call_count > 1:
+            opening.set()
+            if not opened.wait(1):
+                timed_out.append(True)
+        return Mock()
+
+    sa_engine = Mock()
+    sa_engine.connect.side_effect = connect
+    connections = RequestConnections(sa_engine)
+
+    def open_second():
+        with connections.connect():
+            pass
+
+    with connections.connect() as first:
+        thread = threading.Thread(target=open_second)
+        thread.start()
+        opening.wait(1)
+    # idle connection is available while another one is being opened
+    with connections.connect() as connection:
+        reused.append(connection is first and not opened.is_set())
+    opened.set()
+    thread.join()
+    connections.close()
+    assert reused == [True]
+    assert not timed_out
+    assert sa_engine.connect.call_count == 2
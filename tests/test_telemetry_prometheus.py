@@ -1,3 +1,8 @@
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
 import faker
 import pytest
 
@@ -6,9 +11,11 @@ from prometheus_client import REGISTRY
 from hiku import query as q
 from hiku.graph import Graph, Node, Field, Link, Root, apply
 from hiku.types import TypeRef
-from hiku.engine import Engine, pass_context
+from hiku.engine import Engine, pass_context, limit_concurrency
+from hiku.builder import build, Q
 from hiku.sources.graph import SubGraph
 from hiku.executors.sync import SyncExecutor
+from hiku.executors.threads import ThreadsExecutor
 from hiku.executors.asyncio import AsyncIOExecutor
 from hiku.telemetry.prometheus import GraphMetrics, AsyncGraphMetrics
 
@@ -176,3 +183,47 @@ def test_with_pass_context(graph_name, sample_count):
 
     assert sample_count('Root', 'a') == 1.0
     assert sample_count('Root', 'b') == 1.0
+
+
+def test_with_limit_concurrency(graph_name, sample_count):
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    @limit_concurrency(1, key='db')
+    def root_fields(fields):
+        with lock:
+            running.append(1)
+            max_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+        return [1 for _ in fields]
+
+    graph = Graph([
+        Root([
+            Field('a', None, root_fields),
+        ]),
+    ])
+
+    graph = apply(graph, [GraphMetrics(graph_name)])
+    func = graph.root.fields_map['a'].func
+    assert func.__concurrency_limit__ == 1
+    assert func.__concurrency_key__ == 'db'
+
+    results = []
+    with ThreadPoolExecutor(4) as pool:
+        engine = Engine(ThreadsExecutor(pool))
+
+        def execute():
+            results.append(engine.execute(graph, build([Q.a]))['a'])
+
+        threads = [threading.Thread(target=execute) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == [1] * 4
+    assert max(max_running) == 1
+    assert sample_count('Root', 'a') == 4.0
@@ -0,0 +1,69 @@
+import pytest
+import asyncio
+import asyncpg
+
+import hiku.sources.asyncpg
+
+from hiku.utils import cached_property
+from hiku.engine import Engine
+from hiku.readers.simple import read
+from hiku.executors.asyncio import AsyncIOExecutor
+from hiku.sources.asyncpg import RequestConnections
+
+from tests.base import check_result
+from tests.test_source_sqlalchemy import get_queries, AsyncQueries
+from tests.test_source_sqlalchemy import SourceSQLAlchemyTestBase
+
+
+PG_POOL_KEY = 'pg-pool'
+
+
+@pytest.mark.usefixtures('fixture_setter')
+class TestSourceAsyncPG(SourceSQLAlchemyTestBase):
+
+    @cached_property
+    def queries(self):
+        return get_queries(hiku.sources.asyncpg, PG_POOL_KEY, AsyncQueries)
+
+    async def _check(self, src, value, event_loop):
+        pool = await asyncpg.create_pool(self.db_dsn, min_size=0,
+                                         loop=event_loop)
+        try:
+            engine = Engine(AsyncIOExecutor(event_loop))
+            result = await engine.execute(self.graph, read(src),
+                                          {PG_POOL_KEY: pool})
+            check_result(result, value)
+        finally:
+            await pool.close()
+
+    def check(self, src, value):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._check(src, value, loop))
+        finally:
+            loop.close()
+
+
+class TestSourceAsyncPGChunks(TestSourceAsyncPG):
+
+    @cached_property
+    def queries(self):
+        return get_queries(hiku.sources.asyncpg, PG_POOL_KEY, AsyncQueries,
+                           chunk_size=2, fetch_size=1)
+
+
+class TestSourceAsyncPGConnections(TestSourceAsyncPG):
+
+    async def _check(self, src, value, event_loop):
+        pool = await asyncpg.create_pool(self.db_dsn, min_size=0,
+                                         loop=event_loop)
+        try:
+            engine = Engine(AsyncIOExecutor(event_loop))
+            async with RequestConnections(
+                pool, isolation_level='repeatable_read', read_only=True,
+            ) as connections:
+                result = await engine.execute(self.graph, read(src),
+                                              {PG_POOL_KEY: connections})
+            check_result(result, value)
+        finally:
+            await pool.close()